@@ -5,14 +5,20 @@
  
 import os
 import sys
-import ast
-import subprocess
-import urllib.request
-import click
+import io
+import keyword
+import marshal
 import time
 
-# Base directory for act
-BASE_ACT_DIR = os.path.join(os.path.expanduser("~"), ".act")
+# Wall-clock time act's module started executing, for `act run --timings` when the
+# process start time is unknown (see process_started_at)
+ACT_STARTED_AT = time.time()
+
+# click, urllib, subprocess and ast are imported lazily: the fast path for
+# `act run` (see fast_main) only needs the modules above.
+
+# Base directory for act (ACT_HOME moves it elsewhere, as `act bench` does)
+BASE_ACT_DIR = os.environ.get("ACT_HOME") or os.path.join(os.path.expanduser("~"), ".act")
 # Directory for local (user-created) scripts
 LOCAL_SCRIPTS_DIR = os.path.join(BASE_ACT_DIR, "local")
 # Directory for community scripts
@@ -20,220 +26,2339 @@ COMMUNITY_SCRIPTS_DIR = os.path.join(BASE_ACT_DIR, "community")
 # Directory for quarantine (used during installation)
 QUARANTINE_DIR = os.path.join(BASE_ACT_DIR, "quarantine")
 # Base URL for community scripts in the GitHub repository
-REPO_URL_BASE = "https://raw.githubusercontent.com/janoelze/act/main/community-scripts"
+# (ACT_REPO_URL_BASE points act at a mirror or a local server for development)
+REPO_URL_BASE = os.environ.get("ACT_REPO_URL_BASE", "https://raw.githubusercontent.com/janoelze/act/main/community-scripts")
+# Machine-readable manifest of all community scripts, published by ci/update-readme.py
+MANIFEST_URL = f"{REPO_URL_BASE}/index"
+# Seconds a cached manifest is used without revalidating it
+MANIFEST_MAX_AGE = 5 * 60
+# Number of scripts downloaded concurrently by `act install`
+DOWNLOAD_JOBS = 8
+# Timeout in seconds for HTTP requests
+HTTP_TIMEOUT = 30
+# Maximum number of redirects followed per HTTP request
+HTTP_MAX_REDIRECTS = 5
+# On-disk cache of HTTP responses, revalidated with ETag/Last-Modified
+HTTP_CACHE_DIR = os.path.join(BASE_ACT_DIR, "cache", "http")
+# Maximum total size of the HTTP cache; least recently used responses are evicted first
+HTTP_CACHE_MAX_BYTES = 32 * 1024 * 1024
 # Global bin directory for shims
-BIN_DIR = os.path.join(os.path.expanduser("~"), ".act", "bin")
+BIN_DIR = os.path.join(BASE_ACT_DIR, "bin")
+# Persistent index of installed scripts and their parsed headers
+INDEX_PATH = os.path.join(BASE_ACT_DIR, "index.marshal")
+INDEX_VERSION = 3
+# The index's lookup table on its own, without the headers, split by name into
+# LOOKUP_SHARDS files so `act run` reads one small file (see resolve_script)
+LOOKUP_DIR = os.path.join(BASE_ACT_DIR, "lookup")
+LOOKUP_SHARDS = 64
+# Trigram index of script names and descriptions used by `act search`, derived from the script index
+SEARCH_INDEX_PATH = os.path.join(BASE_ACT_DIR, "search.marshal")
+SEARCH_INDEX_VERSION = 1
+# Weight of a trigram match in each header field (at most 7, see build_search_index)
+SEARCH_FIELD_WEIGHTS = {"command": 4, "aliases": 3, "description": 1, "author": 1}
+# Fraction of a query's trigrams an entry must match to be a result
+SEARCH_MIN_MATCH = 0.5
+# Dependency fingerprints of the scripts whose environments were pre-built by `act warm`
+WARM_STATE_PATH = os.path.join(BASE_ACT_DIR, "warm.marshal")
+# Default number of environments `act warm` builds concurrently
+WARM_JOBS = 4
+# Default number of runs `act map` keeps going at a time
+MAP_JOBS = os.cpu_count() or 4
+# Maximum number of bytes read from a script while looking for its header
+MAX_HEADER_BYTES = 64 * 1024
+# Header constants that can be parsed without the AST
+SIMPLE_CONSTANTS = {"True": True, "False": False, "None": None}
+# Script namespaces in order of precedence
+SCRIPT_DIRS = [("local", LOCAL_SCRIPTS_DIR), ("community", COMMUNITY_SCRIPTS_DIR)]
+# Template for the synthetic scripts used by `act bench`
+SYNTHETIC_SCRIPT = """# /// script
+# command = "{command}"
+# description = "A synthetic script for benchmarking act"
+# aliases = ["{command}-alias"]
+# author = "act"
+# dependencies = []
+# ///
+
+print("Hello, world!")
+"""
+# Append-only history of `act run` invocations, rotated to HISTORY_PATH + ".1"
+HISTORY_PATH = os.path.join(BASE_ACT_DIR, "history.log")
+# Size at which the run history is rotated
+HISTORY_MAX_BYTES = 512 * 1024
+# Minimum number of runs before and after a script update to compare their latency
+REGRESSION_MIN_RUNS = 3
+# Slowdown of the median latency after a script update that is flagged as a regression
+REGRESSION_THRESHOLD = 1.25
+# Generated wrapper scripts that run a script under instrumentation (see write_bootstrap)
+BOOTSTRAP_DIR = os.path.join(BASE_ACT_DIR, "cache", "bootstrap")
+# Bootstrap code that records when the script's interpreter came up for `act run --timings`
+TIMINGS_BOOTSTRAP = """
+import os, sys, time
+_act_started, _act_cpu = time.time(), time.process_time()
+import runpy
+with open(os.environ.pop("ACT_TIMINGS_FILE"), "w") as _act_f:
+    _act_f.write(f"{{_act_started}} {{_act_cpu}}")
+sys.argv[0] = {script_path!r}
+sys.path[0] = os.path.dirname({script_path!r})
+runpy.run_path({script_path!r}, run_name="__main__")
+"""
+# Output of `act run --profile`
+PROFILES_DIR = os.path.join(BASE_ACT_DIR, "profiles")
+# Number of functions or allocation sites shown after a profiled run
+PROFILE_TOP_N = 15
+# Bootstrap code that runs a script under cProfile for `act run --profile=cpu`
+CPU_PROFILE_BOOTSTRAP = """
+import os, sys, runpy, cProfile
+_act_profile_file = os.environ.pop("ACT_PROFILE_FILE")
+sys.argv[0] = {script_path!r}
+sys.path[0] = os.path.dirname({script_path!r})
+_act_profiler = cProfile.Profile()
+try:
+    _act_profiler.runcall(runpy.run_path, {script_path!r}, run_name="__main__")
+finally:
+    _act_profiler.dump_stats(_act_profile_file)
+"""
+# Bootstrap code that runs a script under tracemalloc for `act run --profile=mem`
+MEM_PROFILE_BOOTSTRAP = """
+import os, sys, runpy, tracemalloc
+_act_profile_file = os.environ.pop("ACT_PROFILE_FILE")
+sys.argv[0] = {script_path!r}
+sys.path[0] = os.path.dirname({script_path!r})
+tracemalloc.start(10)
+try:
+    runpy.run_path({script_path!r}, run_name="__main__")
+finally:
+    _act_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.take_snapshot().dump(_act_profile_file)
+    with open(_act_profile_file + ".peak", "w") as _act_f:
+        _act_f.write(str(_act_peak))
+"""
+# Directory of the flat completion cache read by the shell completion scripts
+COMPLETION_DIR = os.path.join(BASE_ACT_DIR, "completion")
+# Shell completion scripts printed by `act completion`; @CACHE@ is replaced with
+# COMPLETION_DIR. They only read the cache files, so a TAB never starts Python.
+COMPLETION_SCRIPTS = {
+    "bash": r"""# act completion for bash
+_act_complete() {
+    local cache=@CACHE@ cur words cword i=1 l candidates=()
+    if declare -F _get_comp_words_by_ref >/dev/null; then
+        _get_comp_words_by_ref -n : cur words cword
+    else
+        cur=${COMP_WORDS[COMP_CWORD]} words=("${COMP_WORDS[@]}") cword=$COMP_CWORD
+    fi
+    case ${words[1]} in -q|--quiet) i=2 ;; esac
+    if [ "$cword" -eq "$i" ]; then
+        # No mapfile: macOS ships bash 3.2.
+        [ -r "$cache/subcommands" ] && while IFS= read -r l; do candidates+=("$l"); done < "$cache/subcommands"
+    elif [ "$cword" -eq $((i + 1)) ] || [ "${words[cword-1]}" = "!" ]; then
+        case ${words[i]} in
+            run|edit|delete|meta|warm|map|pipe|stats)
+                [ -r "$cache/scripts" ] && while IFS= read -r l; do candidates+=("$l"); done < "$cache/scripts" ;;
+            completion) candidates=(bash zsh fish) ;;
+        esac
+    fi
+    [ ${#candidates[@]} -gt 0 ] || return 0
+    COMPREPLY=($(compgen -W "${candidates[*]}" -- "$cur"))
+    declare -F __ltrim_colon_completions >/dev/null && __ltrim_colon_completions "$cur"
+}
+complete -o default -F _act_complete act
+""",
+    "zsh": r"""#compdef act
+# act completion for zsh
+_act() {
+    local cache=@CACHE@ i=2
+    local -a candidates
+    [[ $words[2] == (-q|--quiet) ]] && i=3
+    if (( CURRENT == i )); then
+        [[ -r $cache/subcommands ]] && candidates=("${(@f)$(<$cache/subcommands)}")
+    elif (( CURRENT == i + 1 )) || [[ $words[CURRENT-1] == '!' ]]; then
+        case $words[i] in
+            run|edit|delete|meta|warm|map|pipe|stats)
+                [[ -r $cache/scripts ]] && candidates=("${(@f)$(<$cache/scripts)}") ;;
+            completion) candidates=(bash zsh fish) ;;
+        esac
+    fi
+    if (( $#candidates )); then
+        compadd -a candidates
+    else
+        _files
+    fi
+}
+compdef _act act
+""",
+    "fish": r"""# act completion for fish
+function __act_cache
+    set -l file @CACHE@/$argv[1]
+    test -r $file; or return
+    while read -l line
+        echo $line
+    end < $file
+end
+complete -c act -n __fish_use_subcommand -f -a '(__act_cache subcommands)'
+complete -c act -n '__fish_seen_subcommand_from run edit delete meta warm map pipe stats' -a '(__act_cache scripts)'
+complete -c act -n '__fish_seen_subcommand_from completion' -f -a 'bash zsh fish'
+""",
+}
+# Unix socket of the `act serve` launcher daemon
+SERVE_SOCKET = os.path.join(BASE_ACT_DIR, "serve.sock")
+# Seconds the daemon waits for a new zygote to import its environment
+ZYGOTE_START_TIMEOUT = 600
+# Bootstrap code of a zygote: a pre-imported interpreter for one dependency set that
+# forks a worker per request (see serve_forever)
+ZYGOTE_BOOTSTRAP = """
+import os, sys, ast, signal, socket, runpy, traceback, importlib
+
+_act_sock = socket.socket(fileno=int(os.environ.pop("ACT_ZYGOTE_FD")))
+
+
+def _act_recv_exact(size):
+    data = b""
+    while len(data) < size:
+        chunk = _act_sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def _act_run_worker(request, fds):
+    # Take over the caller's stdio, working directory, environment and argv.
+    for target, fd in enumerate(fds[:3]):
+        os.dup2(fd, target)
+    for fd in fds:
+        os.close(fd)
+    os.setsid()
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.stdin = sys.__stdin__ = open(0, "r", closefd=False)
+    sys.stdout = sys.__stdout__ = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, "w", buffering=1, closefd=False)
+    sys.argv = [request["script"]] + request["argv"]
+    sys.path[0] = os.path.dirname(request["script"])
+    code = 0
+    try:
+        runpy.run_path(request["script"], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    os._exit(code)
+
+
+signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+_act_sock.sendall(b"ready\\n")
+while True:
+    try:
+        _act_header, _act_fds, _, _ = socket.recv_fds(_act_sock, 4, 4)
+        if not _act_header:
+            break
+        _act_request = ast.literal_eval(_act_recv_exact(int.from_bytes(_act_header, "big")).decode("utf-8"))
+    except (EOFError, OSError):
+        break
+    # Import the script's modules here, once, so every forked worker starts with them.
+    for _act_module in _act_request["preload"]:
+        if _act_module not in sys.modules:
+            try:
+                importlib.import_module(_act_module)
+            except Exception:
+                pass
+    if os.fork() == 0:
+        # Monitor process: start the worker, wait for it and report its exit status.
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        _act_sock.close()
+        _act_pid = os.fork()
+        if _act_pid == 0:
+            _act_run_worker(_act_request, _act_fds)
+        _act_client = socket.socket(fileno=_act_fds[3])
+        for _act_fd in _act_fds[:3]:
+            os.close(_act_fd)
+        try:
+            _act_client.sendall(b"pid %d\\n" % _act_pid)
+            _, _act_status = os.waitpid(_act_pid, 0)
+            _act_client.sendall(b"exit %d\\n" % os.waitstatus_to_exitcode(_act_status))
+        finally:
+            os._exit(0)
+    for _act_fd in _act_fds:
+        os.close(_act_fd)
+"""
+# ANSI color codes used by secho
+ANSI_COLORS = {"red": 31, "green": 32, "yellow": 33}
+
+class ConnectionPool:
+    """
+    A minimal pool of keep-alive HTTP(S) connections that can be shared between threads.
+
+    Connections are kept per scheme and host and handed out to one request at a time,
+    so concurrent downloads from the same host reuse a handful of connections instead
+    of opening one per request. Like urllib, the pool follows redirects and goes
+    through the proxies configured in the environment (http_proxy, https_proxy and
+    no_proxy); HTTPS is tunneled through the proxy with CONNECT.
+    """
+
+    def __init__(self):
+        import threading
+        import urllib.request
+
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._proxies = urllib.request.getproxies()
+
+    def _proxy(self, scheme, host):
+        """Return the proxy URL to reach host with, or None to connect directly."""
+        import urllib.request
+
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return proxy if "://" in proxy else f"http://{proxy}"
+
+    def _connect(self, scheme, netloc, proxy):
+        import base64
+        import http.client
+        import urllib.parse
+
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if not proxy:
+            return connection_class(netloc, timeout=HTTP_TIMEOUT)
+        proxy_parts = urllib.parse.urlsplit(proxy)
+        proxy_headers = {}
+        if proxy_parts.username:
+            credentials = f"{urllib.parse.unquote(proxy_parts.username)}:{urllib.parse.unquote(proxy_parts.password or '')}"
+            proxy_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+        proxy_netloc = proxy_parts.netloc.rpartition("@")[2]
+        if scheme == "https":
+            conn = connection_class(proxy_netloc, timeout=HTTP_TIMEOUT)
+            conn.set_tunnel(netloc, headers=proxy_headers)
+        else:
+            conn = http.client.HTTPConnection(proxy_netloc, timeout=HTTP_TIMEOUT)
+            conn.proxy_headers = proxy_headers
+        return conn
+
+    def _acquire(self, scheme, netloc, proxy):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self._connect(scheme, netloc, proxy), False
+
+    def _release(self, scheme, netloc, conn):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(conn)
+
+    def get(self, url, headers=None):
+        """Send a GET request, following redirects, and return (status, headers, body)."""
+        import urllib.parse
+
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            status, response_headers, body = self._get(url, headers)
+            location = response_headers.get("Location")
+            if status not in (301, 302, 303, 307, 308) or not location:
+                break
+            redirect = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(redirect).scheme not in ("http", "https"):
+                break
+            url = redirect
+        return status, response_headers, body
+
+    def _get(self, url, headers):
+        import http.client
+        import urllib.parse
+
+        parts = urllib.parse.urlsplit(url)
+        proxy = self._proxy(parts.scheme, parts.hostname or "")
+        if proxy and parts.scheme == "http":
+            # A plain HTTP proxy is sent the absolute URL.
+            target = urllib.parse.urlunsplit(parts._replace(fragment=""))
+        else:
+            target = parts.path + (f"?{parts.query}" if parts.query else "")
+        while True:
+            conn, reused = self._acquire(parts.scheme, parts.netloc, proxy)
+            try:
+                conn.request("GET", target or "/", headers=dict(headers or {}, **getattr(conn, "proxy_headers", {})))
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # The server may have closed an idle connection; retry on a fresh one.
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(parts.scheme, parts.netloc, conn)
+            return response.status, response.headers, body
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+def http_cache_path(url):
+    """Return the path of the cache file for a URL."""
+    import hashlib
+
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".marshal")
+
+def read_http_cache(url):
+    """Return the cached response for a URL as a dict, or None if it is not cached."""
+    cache_path = http_cache_path(url)
+    entry = load_state(cache_path)
+    if entry.get("url") != url:
+        return None
+    try:
+        # The cache file's mtime records when it was last used, for LRU eviction.
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return entry
+
+def write_http_cache(url, headers, body):
+    """Store a response in the HTTP cache and evict old responses if it grew too large."""
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    entry = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "validated": time.time(),
+        "body": body,
+    }
+    write_atomic(http_cache_path(url), marshal.dumps(entry))
+    evict_http_cache()
+
+def evict_http_cache(max_bytes=HTTP_CACHE_MAX_BYTES):
+    """Remove least recently used responses until the HTTP cache fits in max_bytes."""
+    entries = []
+    with os.scandir(HTTP_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".marshal"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def http_get_cached(url, pool, max_age=None):
+    """
+    GET a URL through the on-disk HTTP cache.
+
+    Cached URLs are revalidated with If-None-Match/If-Modified-Since and a 304 is
+    answered from disk. With max_age, a cached response validated less than max_age
+    seconds ago is used without a request. If the network or server is unavailable,
+    the cached copy is served instead. Returns (status, body, offline), where offline
+    is True if the body came from the cache because revalidation failed.
+    """
+    import http.client
+
+    cached = read_http_cache(url)
+    if cached and max_age is not None and time.time() - cached.get("validated", 0) < max_age:
+        return 200, cached["body"], False
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        status, response_headers, body = pool.get(url, headers)
+    except (http.client.HTTPException, OSError):
+        if cached:
+            return 200, cached["body"], True
+        raise
+
+    if status == 304 and cached:
+        if max_age is not None:
+            write_http_cache(url, {"ETag": cached["etag"], "Last-Modified": cached["last_modified"]}, cached["body"])
+        return 200, cached["body"], False
+    if status >= 500 and cached:
+        return 200, cached["body"], True
+    if status == 200 and (response_headers.get("ETag") or response_headers.get("Last-Modified")):
+        write_http_cache(url, response_headers, body)
+    return status, body, False
+
+def fetch_manifest(pool=None, max_age=MANIFEST_MAX_AGE):
+    """
+    Return the list of community scripts from the manifest, or None if it is unavailable.
+
+    Each entry has the keys of ci/update-readme.py's index plus "name", the file name
+    without ".py" that the script is downloaded by. The manifest is cached on disk and
+    only revalidated once it is older than max_age seconds.
+    """
+    import http.client
+    import json
+
+    try:
+        status, body, _ = http_get_cached(MANIFEST_URL, pool or ConnectionPool(), max_age=max_age)
+    except (http.client.HTTPException, OSError):
+        return None
+    if status != 200:
+        return None
+    try:
+        scripts = json.loads(body.decode("utf-8"))["scripts"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    for script in scripts:
+        script["name"] = os.path.splitext(os.path.basename(script["file"]))[0]
+    return scripts
+
+def resolve_community_name(script_name, manifest):
+    """
+    Resolve a command, alias or file name to the name a community script is downloaded by.
+
+    Commands take precedence over file names, and file names over aliases. Without a
+    manifest, or if nothing matches, the name is returned unchanged.
+    """
+    for field in ("command", "name", "aliases"):
+        for script in manifest or []:
+            value = script.get(field)
+            if value == script_name or (field == "aliases" and script_name in (value or [])):
+                return script["name"]
+    return script_name
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def swap_in_scripts(staged):
+    """
+    Move staged (source, target) script files into place as a batch.
+
+    Current versions are backed up first; if any move fails, every target is
+    restored from its backup before the error is raised.
+    """
+    import shutil
+
+    backups = []
+    try:
+        for _, target in staged:
+            if os.path.exists(target):
+                backup = os.path.join(QUARANTINE_DIR, f".{os.path.basename(target)}.bak")
+                shutil.copy2(target, backup)
+                backups.append((backup, target))
+        for source, target in staged:
+            os.replace(source, target)
+    except OSError:
+        for backup, target in backups:
+            os.replace(backup, target)
+        raise
+    for backup, _ in backups:
+        os.remove(backup)
+
+def fetch_community_script(script_name, pool=None, sha256=None):
+    """
+    Download a community script and return its content.
+
+    Responses are cached on disk (see http_get_cached). Pass a ConnectionPool to
+    reuse connections across downloads, and the script's hash from the manifest to
+    verify the download. The manifest may be a cached copy older than the script, so
+    on a mismatch the hash is checked once more against a freshly fetched manifest.
+    """
+    import hashlib
+    import http.client
+
+    pool = pool or ConnectionPool()
+    url = f"{REPO_URL_BASE}/{script_name}.py"
+    try:
+        status, body, offline = http_get_cached(url, pool)
+    except (http.client.HTTPException, OSError) as e:
+        raise click.ClickException(f"Failed to download script '{script_name}': {e}")
+    if status != 200:
+        raise click.ClickException(f"Failed to download script '{script_name}': HTTP {status}")
+    if offline:
+        global_echo(f"Warning: could not reach {REPO_URL_BASE}; using the cached copy of '{script_name}'.")
+    digest = hashlib.sha256(body).hexdigest()
+    if sha256 and digest != sha256:
+        manifest = fetch_manifest(pool, max_age=0)
+        fresh = [script.get("sha256") for script in manifest or [] if script["name"] == script_name]
+        if fresh != [digest]:
+            raise click.ClickException(
+                f"Downloaded script '{script_name}' does not match the hash in the manifest; try again later."
+            )
+    return body.decode("utf-8")
+
+def fetch_community_scripts(script_names, jobs=DOWNLOAD_JOBS, pool=None, hashes=None):
+    """
+    Download several community scripts concurrently over a shared connection pool.
+
+    hashes optionally maps script names to the SHA-256 they must have. Returns
+    (contents, errors): dicts mapping script names to their content or to the error
+    message of a failed download.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = pool or ConnectionPool()
+    hashes = hashes or {}
+    contents, errors = {}, {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(script_names)))) as executor:
+            futures = {
+                name: executor.submit(fetch_community_script, name, pool, hashes.get(name))
+                for name in script_names
+            }
+            for name, future in futures.items():
+                try:
+                    contents[name] = future.result()
+                except click.ClickException as e:
+                    errors[name] = e.message
+    finally:
+        pool.close()
+    return contents, errors
+
+def sanitize_script_name(script_name):
+    """Enforce alphanumeric characters, dashes, and underscores only."""
+    return "".join(c for c in script_name if c.isalnum() or c in "-_")
+
+def path_to_self():
+    """Return the path to the act.py script."""
+    return os.path.abspath(__file__)
+
+def ensure_scripts_dir():
+    """Ensure that all required directories exist."""
+    os.makedirs(LOCAL_SCRIPTS_DIR, exist_ok=True)
+    os.makedirs(COMMUNITY_SCRIPTS_DIR, exist_ok=True)
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+
+def write_atomic(path, data, mode=None):
+    """
+    Write data (str or bytes) to path via a temporary file and a rename.
+
+    Readers see either the old or the new file, never a partially written one.
+    """
+    directory, filename = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{filename}.{os.getpid()}.{id(data)}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data.encode("utf-8") if isinstance(data, str) else data)
+    if mode is not None:
+        os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+def read_header_lines(f) -> list:
+    """
+    Read the header block from an open text file, line by line.
+
+    Reading stops at the closing "# ///" delimiter, so the rest of the script is never
+    read. At most MAX_HEADER_BYTES characters are read while looking for the header.
+    Returns the header lines with their leading '#' removed.
+    """
+    header_started = False
+    header_lines = []
+    remaining = MAX_HEADER_BYTES
+
+    while remaining > 0:
+        line = f.readline(remaining)
+        if not line:
+            break
+        remaining -= len(line)
+        stripped = line.strip()
+        # Detect header delimiters: lines starting with "# ///"
+        if stripped.startswith("# ///"):
+            if not header_started:
+                header_started = True
+                continue  # skip the starting delimiter line
+            else:
+                # Stop at the ending delimiter
+                return header_lines
+
+        if header_started:
+            if stripped.startswith("#"):
+                # Remove the leading '#' and extra whitespace
+                content = stripped[1:].strip()
+                header_lines.append(content)
+    else:
+        if header_started:
+            raise ValueError(f"Header exceeds {MAX_HEADER_BYTES} bytes")
+
+    return header_lines
+
+def parse_simple_value(text: str):
+    """
+    Parse a simple header value without going through the AST.
+
+    Supports plain quoted strings, integers, booleans, None and flat lists of plain
+    strings. Raises ValueError for anything else.
+    """
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        inner = text[1:-1]
+        if text[0] not in inner and "\\" not in inner:
+            return inner
+    elif text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        if not inner:
+            return []
+        items = [item.strip() for item in inner.split(",")]
+        if items[-1] == "":
+            items.pop()  # allow a trailing comma
+        values = [parse_simple_value(item) for item in items]
+        if all(isinstance(value, str) for value in values):
+            return values
+    elif text in SIMPLE_CONSTANTS:
+        return SIMPLE_CONSTANTS[text]
+    else:
+        digits = text[1:] if text.startswith("-") else text
+        if digits.isascii() and digits.isdigit() and (digits == "0" or not digits.startswith("0")):
+            return int(text)
+    raise ValueError(f"Not a simple value: {text}")
+
+def parse_header_ast(header_lines: list) -> dict:
+    """Parse header lines as Python assignments using the AST."""
+    import ast
+
+    header_str = "\n".join(header_lines)
+
+    try:
+        tree = ast.parse(header_str, mode='exec')
+    except SyntaxError as e:
+        raise ValueError("Failed to parse header content") from e
+
+    header_dict = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            if len(node.targets) != 1:
+                continue
+            target = node.targets[0]
+            if isinstance(target, ast.Name):
+                key = target.id
+                try:
+                    value = ast.literal_eval(node.value)
+                except Exception as e:
+                    raise ValueError(f"Unable to evaluate value for key '{key}'") from e
+                header_dict[key] = value
+
+    return header_dict
+
+def parse_header_lines(header_lines: list) -> dict:
+    """
+    Parse header lines into a dictionary of key-value pairs.
+
+    Lines of the form `key = <simple literal>` are parsed directly. If any line is
+    not of that form (multi-line lists, expressions, comments, ...), the whole header
+    is parsed with the AST instead.
+    """
+    header_dict = {}
+    for line in header_lines:
+        if not line:
+            continue
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key.isidentifier() or keyword.iskeyword(key):
+            return parse_header_ast(header_lines)
+        try:
+            header_dict[key] = parse_simple_value(value.strip())
+        except ValueError:
+            return parse_header_ast(header_lines)
+    return header_dict
+
+def parse_header(file_content: str) -> dict:
+    """
+    Parse a header block in the given file content and return a dictionary of its key-value pairs.
+    The header block is expected to be enclosed between lines starting with "# ///".
+    """
+    return parse_header_lines(read_header_lines(io.StringIO(file_content)))
+
+def parse_script_metadata(file_path):
+    """
+    Parse the inline dependency header of a script file.
+    Returns a dict with keys like 'command', 'aliases', 'author', 'dependencies'.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return parse_header_lines(read_header_lines(f))
+
+def load_index():
+    """Load the script index from disk, or return an empty index if it is missing or stale."""
+    try:
+        with open(INDEX_PATH, "rb") as f:
+            index = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        index = None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        index = {"version": INDEX_VERSION, "dirs": {}}
+    return index
+
+def save_index(index):
+    """
+    Atomically write the script index, and the lookup table shards for resolve_script, to disk.
+
+    Both are stored with marshal rather than json: a lookup shard is read on every
+    `act run`, and marshal loads faster without pulling in the json and re modules.
+    Each shard maps the names that hash to it (see lookup_shard) to (namespace,
+    filename, mtime, size, command), so resolving a name never loads the script
+    headers or the names of other scripts.
+    """
+    write_atomic(INDEX_PATH, marshal.dumps(index))
+    dirs = [
+        (namespace, index["dirs"][namespace]["path"], index["dirs"][namespace]["mtime"])
+        for namespace, _ in SCRIPT_DIRS
+    ]
+    shards = [{} for _ in range(LOOKUP_SHARDS)]
+    for key, (namespace, entry) in index.get("lookup", {}).items():
+        info = index["dirs"][namespace]["files"][entry]
+        command = (info["metadata"] or {}).get("command")
+        shards[lookup_shard(key)][key] = (namespace, entry, info["mtime"], info["size"], command)
+    os.makedirs(LOOKUP_DIR, exist_ok=True)
+    for number, scripts in enumerate(shards):
+        write_atomic(
+            os.path.join(LOOKUP_DIR, f"{number}.marshal"),
+            marshal.dumps({"version": INDEX_VERSION, "dirs": dirs, "scripts": scripts}),
+        )
+    write_completion_cache("scripts", index.get("lookup", ()))
+
+def lookup_shard(key):
+    """Return the number of the lookup table shard a lookup key is stored in."""
+    import zlib
+
+    return zlib.crc32(key.encode("utf-8")) % LOOKUP_SHARDS
+
+def write_completion_cache(name, entries):
+    """Write the completion cache file name, listing one of entries per line."""
+    try:
+        os.makedirs(COMPLETION_DIR, exist_ok=True)
+        write_atomic(os.path.join(COMPLETION_DIR, name), "".join(f"{entry}\n" for entry in sorted(entries)))
+    except OSError:
+        pass
+
+def refresh_index(timings=None):
+    """
+    Return the script index, re-parsing only the scripts that changed on disk.
+
+    Each file entry caches the parsed header together with the mtime and size it was
+    parsed at. If a script directory's mtime is unchanged, its cached file list is
+    reused and only a stat per file is needed. Scripts whose header cannot be parsed
+    are kept in the index with metadata set to None so they are not re-parsed either.
+
+    If timings is a dict, the time spent parsing headers is added to its
+    "header parse" phase.
+    """
+    ensure_scripts_dir()
+    index = load_index()
+    changed = False
+
+    for namespace, directory in SCRIPT_DIRS:
+        dir_mtime = os.stat(directory).st_mtime_ns
+        cached = index["dirs"].get(namespace)
+        if not cached or cached.get("path") != directory:
+            cached = {"path": directory, "mtime": None, "files": {}}
+        old_files = cached["files"]
+
+        if cached["mtime"] == dir_mtime:
+            entries = list(old_files)
+        else:
+            entries = [entry for entry in os.listdir(directory) if entry.endswith(".py")]
+
+        files = {}
+        for entry in entries:
+            script_path = os.path.join(directory, entry)
+            try:
+                st = os.stat(script_path)
+            except OSError:
+                continue
+            old = old_files.get(entry)
+            if old and old["mtime"] == st.st_mtime_ns and old["size"] == st.st_size:
+                files[entry] = old
+                continue
+            parse_start = time.time()
+            try:
+                metadata = parse_script_metadata(script_path)
+            except Exception:
+                metadata = None
+            if timings is not None:
+                timings["header parse"] = timings.get("header parse", 0.0) + time.time() - parse_start
+            files[entry] = {"mtime": st.st_mtime_ns, "size": st.st_size, "metadata": metadata}
+            changed = True
+
+        if cached["mtime"] != dir_mtime or files.keys() != old_files.keys():
+            changed = True
+        index["dirs"][namespace] = {"path": directory, "mtime": dir_mtime, "files": files}
+
+    if changed or "lookup" not in index or not os.path.isdir(LOOKUP_DIR):
+        index["lookup"], index["collisions"] = build_lookup(index)
+        save_index(index)
+    return index
+
+def build_lookup(index):
+    """
+    Build the lookup table mapping every name a script can be run by to that script.
+
+    Keys are commands, aliases and their "local:"/"community:" namespaced forms;
+    values are (namespace, filename) pairs. When several scripts claim the same
+    name, the winner is chosen deterministically: local before community, a
+    command before an alias, then by filename.
+
+    Returns (lookup, collisions), where collisions lists (name, claimants) for
+    every unqualified name claimed by more than one script, winner first.
+    """
+    claims = {}
+    for namespace, _ in SCRIPT_DIRS:
+        files = index["dirs"][namespace]["files"]
+        for field in ("command", "aliases"):
+            for entry in sorted(files):
+                metadata = files[entry]["metadata"]
+                if not metadata:
+                    continue
+                names = metadata.get(field, [])
+                if field == "command":
+                    names = [names]
+                elif not isinstance(names, list):
+                    continue
+                for name in names:
+                    if not isinstance(name, str) or not name:
+                        continue
+                    for key in (name, f"{namespace}:{name}"):
+                        claimants = claims.setdefault(key, [])
+                        if (namespace, entry) not in claimants:
+                            claimants.append((namespace, entry))
+
+    lookup = {key: claimants[0] for key, claimants in claims.items()}
+    collisions = [
+        (key, claimants) for key, claimants in sorted(claims.items())
+        if len(claimants) > 1 and key.split(":", 1)[0] not in ("local", "community")
+    ]
+    return lookup, collisions
+
+def lookup_key(script_identifier):
+    """Return the lookup table key for a script identifier."""
+    if ":" in script_identifier:
+        namespace, command = script_identifier.split(":", 1)
+        namespace = namespace.lower()
+        if namespace in ("local", "community"):
+            return f"{namespace}:{command}"
+        return command
+    return script_identifier
+
+def index_entry(index, key):
+    """Return (namespace, script_path, file_info) for a lookup key, or None."""
+    target = index.get("lookup", {}).get(key)
+    if not target:
+        return None
+    namespace, entry = target
+    directory = index["dirs"][namespace]
+    return namespace, os.path.join(directory["path"], entry), directory["files"][entry]
+
+def iter_scripts(namespaces=None):
+    """
+    Yield (namespace, script_path, metadata) for every installed script.
+
+    Local scripts are yielded before community scripts. metadata is None for
+    scripts whose header could not be parsed.
+    """
+    index = refresh_index()
+    for namespace, directory in SCRIPT_DIRS:
+        if namespaces and namespace not in namespaces:
+            continue
+        for entry, info in index["dirs"][namespace]["files"].items():
+            yield namespace, os.path.join(directory, entry), info["metadata"]
+
+def find_script_entry(script_identifier, timings=None):
+    """
+    Find a script by its identifier.
+
+    If the identifier is prefixed with a namespace (e.g. "community:weather" or "local:weather"),
+    the search is limited to that namespace. Without a prefix, local scripts take precedence
+    over community scripts (see build_lookup).
+
+    The index's lookup table is trusted as long as both script directories and the
+    resolved script are unchanged on disk. Otherwise the index is refreshed first,
+    adding the time spent parsing headers to timings if it is a dict (see
+    refresh_index). This loads every script's header; resolve_script finds a script
+    without them.
+
+    Returns a (namespace, script_path, metadata) tuple or None if not found.
+    """
+    key = lookup_key(script_identifier)
+    index = load_index()
+    try:
+        current = "lookup" in index and all(
+            index["dirs"][namespace]["path"] == directory
+            and index["dirs"][namespace]["mtime"] == os.stat(directory).st_mtime_ns
+            for namespace, directory in SCRIPT_DIRS
+        )
+        found = index_entry(index, key) if current else None
+        if found:
+            st = os.stat(found[1])
+            if found[2]["mtime"] == st.st_mtime_ns and found[2]["size"] == st.st_size:
+                return found[0], found[1], found[2]["metadata"]
+    except (OSError, KeyError):
+        pass
+
+    found = index_entry(refresh_index(timings), key)
+    if not found:
+        return None
+    return found[0], found[1], found[2]["metadata"]
+
+def resolve_script(script_identifier, timings=None):
+    """
+    Resolve a script identifier the way find_script_entry does, without its header.
+
+    Reads the lookup table shard that save_index wrote for the name, which holds no
+    script headers, so resolving a name costs one small marshal load and a few stats
+    however many scripts are installed. If a script directory or the resolved script changed since the table was written,
+    the index is refreshed instead (see refresh_index for timings).
+
+    Returns a (namespace, script_path, command) tuple or None if not found.
+    """
+    key = lookup_key(script_identifier)
+    table = load_state(os.path.join(LOOKUP_DIR, f"{lookup_shard(key)}.marshal"))
+    try:
+        current = table.get("version") == INDEX_VERSION and table["dirs"] == [
+            (namespace, directory, os.stat(directory).st_mtime_ns) for namespace, directory in SCRIPT_DIRS
+        ]
+        found = table["scripts"].get(key) if current else None
+        if found:
+            namespace, entry, mtime, size, command = found
+            script_path = os.path.join(dict(SCRIPT_DIRS)[namespace], entry)
+            st = os.stat(script_path)
+            if st.st_mtime_ns == mtime and st.st_size == size:
+                return namespace, script_path, command
+    except (OSError, KeyError, TypeError, ValueError):
+        pass
+
+    found = index_entry(refresh_index(timings), key)
+    if not found:
+        return None
+    return found[0], found[1], (found[2]["metadata"] or {}).get("command")
+
+def get_collisions():
+    """Return the (name, claimants) pairs of names claimed by more than one script."""
+    return refresh_index()["collisions"]
+
+def script_info(namespace, script_path, metadata):
+    """Return a JSON-serializable summary of a script, as printed by `list --json` and `search --json`."""
+    metadata = metadata or {}
+    aliases = metadata.get("aliases")
+    return {
+        "namespace": namespace,
+        "command": metadata.get("command") or os.path.splitext(os.path.basename(script_path))[0],
+        "aliases": aliases if isinstance(aliases, list) else [],
+        "description": metadata.get("description"),
+        "author": metadata.get("author"),
+        "path": script_path,
+    }
+
+def find_script(script_identifier):
+    """
+    Find a script by its identifier.
+
+    Returns the full path of the script or None if not found.
+    """
+    entry = find_script_entry(script_identifier)
+    return entry[1] if entry else None
+
+def search_words(text):
+    """Split text into lowercase alphanumeric words."""
+    words = []
+    word = []
+    for char in str(text).lower():
+        if char.isalnum():
+            word.append(char)
+        elif word:
+            words.append("".join(word))
+            word = []
+    if word:
+        words.append("".join(word))
+    return words
+
+def trigrams(words):
+    """Return the set of trigrams of words, each padded with spaces to mark word boundaries."""
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def build_search_index(index):
+    """
+    Build the search index from the script index.
+
+    records holds one line per script with its namespace, filename, command,
+    aliases, description, author and normalized names, separated by tabs, and
+    offsets the start of each line. postings maps each trigram of the header fields
+    to the entries containing it, as an array of unsigned ints (entry id << 3 |
+    field weight). Both are stored as flat strings and bytes, so loading the index
+    costs little more than reading it, and only the entries a query hits are decoded.
+    """
+    from array import array
+
+    lines = []
+    offsets = array("I")
+    position = 0
+    postings = {}
+    for namespace, _ in SCRIPT_DIRS:
+        for filename, info in sorted(index["dirs"][namespace]["files"].items()):
+            metadata = info["metadata"] or {}
+            aliases = metadata.get("aliases")
+            fields = {
+                "command": str(metadata.get("command") or os.path.splitext(filename)[0]),
+                "aliases": [str(alias) for alias in aliases] if isinstance(aliases, list) else [],
+                "description": str(metadata.get("description") or ""),
+                "author": str(metadata.get("author") or ""),
+            }
+            entry_id = len(offsets)
+            names = ["".join(search_words(name)) for name in [fields["command"]] + fields["aliases"]]
+            line = "\t".join(
+                value.replace("\t", " ").replace("\n", " ") for value in
+                (namespace, filename, fields["command"], "\x1f".join(fields["aliases"]),
+                 fields["description"], fields["author"], " ".join(names))
+            ) + "\n"
+            offsets.append(position)
+            lines.append(line)
+            position += len(line)
+            weights = {}
+            for field, value in fields.items():
+                words = search_words(" ".join(value) if isinstance(value, list) else value)
+                for gram in trigrams(words):
+                    weights[gram] = max(weights.get(gram, 0), SEARCH_FIELD_WEIGHTS[field])
+            for gram, weight in weights.items():
+                postings.setdefault(gram, array("I")).append(entry_id << 3 | weight)
+    offsets.append(position)
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "records": "".join(lines),
+        "offsets": offsets.tobytes(),
+        "postings": {gram: ids.tobytes() for gram, ids in postings.items()},
+    }
+
+def load_search_index():
+    """
+    Return the search index, rebuilding it if the installed scripts changed since it was built.
+
+    The search index records the mtimes of the script directories it was built from.
+    While they are unchanged it is used without loading the script index, so a search
+    costs a few stats and one marshal load. Edits to a script's header that leave its
+    directory untouched are picked up the next time the directory changes or the
+    script index is refreshed.
+    """
+    search_index = load_state(SEARCH_INDEX_PATH)
+    try:
+        source = [os.stat(directory).st_mtime_ns for _, directory in SCRIPT_DIRS]
+        st = os.stat(INDEX_PATH)
+        source.append((st.st_mtime_ns, st.st_size))
+    except OSError:
+        source = None
+    if source and search_index.get("version") == SEARCH_INDEX_VERSION and search_index.get("source") == source:
+        return search_index
+
+    index = refresh_index()
+    search_index = build_search_index(index)
+    st = os.stat(INDEX_PATH)
+    search_index["source"] = [index["dirs"][namespace]["mtime"] for namespace, _ in SCRIPT_DIRS]
+    search_index["source"].append((st.st_mtime_ns, st.st_size))
+    write_atomic(SEARCH_INDEX_PATH, marshal.dumps(search_index))
+    return search_index
+
+def search_scripts(query, limit=None):
+    """
+    Search the installed scripts by command, aliases, description and author.
+
+    Entries are scored by the weighted fraction of the query's trigrams they
+    contain, so misspellings and partial words still match, with bonuses for exact,
+    prefix and substring matches of the command or an alias. Returns a list of
+    (score, (namespace, filename, command, aliases, description, author)) pairs,
+    best first.
+    """
+    from array import array
+
+    search_index = load_search_index()
+    offsets = array("I")
+    offsets.frombytes(search_index["offsets"])
+    records = search_index["records"]
+    words = search_words(query)
+    query_grams = trigrams(words)
+    if not query_grams:
+        return []
+    max_weight = max(SEARCH_FIELD_WEIGHTS.values())
+    needle = "".join(words)
+    # Queries too short for a whole trigram still match names by prefix or substring.
+    hits = {entry_id: [0, 0] for entry_id in range(len(offsets) - 1)} if len(needle) < 3 else {}
+    for gram in query_grams:
+        packed = search_index["postings"].get(gram)
+        if not packed:
+            continue
+        postings = array("I")
+        postings.frombytes(packed)
+        for posting in postings:
+            hit = hits.setdefault(posting >> 3, [0, 0])
+            hit[0] += 1
+            hit[1] += posting & 7
+
+    results = []
+    for entry_id, (matched, weight) in hits.items():
+        fields = records[offsets[entry_id]:offsets[entry_id + 1] - 1].split("\t")
+        names = fields[6].split(" ")
+        score = weight / (len(query_grams) * max_weight)
+        if needle in names:
+            score += 3
+        elif any(name.startswith(needle) for name in names):
+            score += 2
+        elif any(needle in name for name in names):
+            score += 1
+        elif matched < SEARCH_MIN_MATCH * len(query_grams):
+            continue
+        aliases = fields[3].split("\x1f") if fields[3] else []
+        results.append((score, (fields[0], fields[1], fields[2], aliases, fields[4], fields[5])))
+    results.sort(key=lambda result: (-result[0], result[1][2], result[1][0]))
+    return results[:limit] if limit else results
+
+def shim_contents(command, namespace, script_path, via_act=False):
+    """
+    Return the contents of the shim for a script.
+
+    By default the resolved script path is baked into the shim, which launches it
+    with uv directly, or through the `act serve` daemon while its socket exists,
+    and then appends the run to the history the way record_run does (without the
+    max RSS). If the script no longer exists at that path, or ACT_REPORT or ACT_TIMINGS is
+    set in the environment, the shim falls back to "act run" (which re-resolves
+    the script and reports timing and exit codes). With via_act, the shim always
+    goes through "act run".
+    """
+    import shlex
+
+    identifier = f"{namespace}:{command}"
+    # Export the shim's start time for the "act startup" phase of the timings
+    # (date may not support %N, see process_started_at).
+    via_act_line = (
+        'if [ -n "$ACT_TIMINGS" ] && [ "$ACT_TIMINGS" != 0 ]; then\n'
+        '    ACT_SHIM_STARTED=$(date +%s.%N 2>/dev/null); export ACT_SHIM_STARTED\n'
+        'fi\n'
+        f'exec uv run -q {shlex.quote(path_to_self())} run {shlex.quote(identifier)} -- "$@"\n'
+    )
+    if via_act:
+        return "#!/bin/sh\n" + via_act_line
+    return f"""#!/bin/sh
+# act shim for {identifier}
+script={shlex.quote(script_path)}
+if [ -z "$ACT_REPORT" ] && [ -z "$ACT_TIMINGS" ] && [ -f "$script" ]; then
+    args=$#
+    started=$(date +%s%N)
+    trap : INT
+    if [ -S {shlex.quote(SERVE_SOCKET)} ] && command -v python3 >/dev/null 2>&1; then
+        python3 {shlex.quote(path_to_self())} --exec "$script" "$@"
+    else
+        uv run -q "$script" "$@"
+    fi
+    status=$?
+    ended=$(date +%s%N)
+    # Where date does not support %N, it prints a literal N.
+    case $started$ended in *N*) started=${{started%N}}000000000 ended=${{ended%N}}000000000 ;; esac
+    history={shlex.quote(HISTORY_PATH)}
+    : 2>/dev/null >>"$history"
+    set -- $(stat -c '%Y %s' "$script" "$history" 2>/dev/null || stat -f '%m %z' "$script" "$history" 2>/dev/null)
+    version=-
+    [ $# -eq 4 ] && version=$1-$2
+    printf '%d.%03d\t%s\t%s\t%s\t%d\t%d.%04d\t%d\t0\n' \
+        $((ended / 1000000000)) $((ended % 1000000000 / 1000000)) {shlex.quote(command)} {namespace} "$version" "$args" \
+        $(((ended - started) / 1000000000)) $(((ended - started) % 1000000000 / 100000)) "$status" 2>/dev/null >>"$history"
+    if [ "${{4:-0}}" -gt {HISTORY_MAX_BYTES} ] && mkdir "$history.rotating" 2>/dev/null; then
+        # Another process may have rotated the file since it was measured.
+        [ "$(wc -c <"$history")" -gt {HISTORY_MAX_BYTES} ] && mv -f "$history" "$history.1"
+        rmdir "$history.rotating"
+    fi
+    exit $status
+fi
+""" + via_act_line
+
+def create_bin_shims(via_act=False):
+    """
+    Bring the bin shims in line with the installed scripts.
+
+    This function scans both the local and community script directories and
+    computes the shim each script command should have. Each shim points at the
+    script the lookup table resolves its command to, so if both a local and a
+    community script share the same command name, the local version takes
+    precedence. Only new or changed shims are written, each atomically, and only
+    shims without a script are removed, so commands never vanish while linking.
+
+    Returns a dict with the command names that were "created", "updated",
+    "removed" and left "unchanged".
+    """
+    os.makedirs(BIN_DIR, exist_ok=True)
+
+    # Collect installed scripts.
+    # Build a dictionary mapping command names to their desired shim contents.
+    index = refresh_index()
+    desired = {}
+
+    for _, _, metadata in iter_scripts():
+        if metadata is None:
+            continue
+        command = metadata.get("command")
+        if not command or command == "act" or command in desired:
+            continue
+        namespace, script_path, _ = index_entry(index, command)
+        desired[command] = shim_contents(command, namespace, script_path, via_act=via_act)
+
+    existing = {
+        filename for filename in os.listdir(BIN_DIR)
+        if filename != "act" and not filename.startswith(".")
+        and os.path.isfile(os.path.join(BIN_DIR, filename))
+    }
+    changes = {"created": [], "updated": [], "removed": [], "unchanged": []}
+
+    for command, contents in sorted(desired.items()):
+        shim_path = os.path.join(BIN_DIR, command)
+        if command in existing:
+            with open(shim_path, "r", encoding="utf-8", errors="replace") as shim_file:
+                current = shim_file.read()
+            if current == contents and os.access(shim_path, os.X_OK):
+                changes["unchanged"].append(command)
+                continue
+            changes["updated"].append(command)
+        else:
+            changes["created"].append(command)
+        write_atomic(shim_path, contents, mode=0o755)
+
+    for filename in sorted(existing - desired.keys()):
+        os.remove(os.path.join(BIN_DIR, filename))
+        changes["removed"].append(filename)
+
+    return changes
+
+def update_shims(reload_shell=False, via_act=False):
+    """
+    Update the bin shims and report what changed.
+
+    If reload_shell is True and BIN_DIR is not in the current PATH,
+    the user is prompted to add BIN_DIR to PATH and reload the shell.
+    """
+    changes = create_bin_shims(via_act=via_act)
+    linked = len(changes["created"]) + len(changes["updated"]) + len(changes["unchanged"])
+    if not linked:
+        global_echo("No installed scripts found to link.")
+    else:
+        global_echo(
+            f"Successfully linked {linked} scripts in '{BIN_DIR}' "
+            f"({len(changes['created'])} created, {len(changes['updated'])} updated, "
+            f"{len(changes['removed'])} removed)."
+        )
+    for change in ("created", "updated", "removed"):
+        if changes[change]:
+            global_echo(f"  {change.capitalize()}: {', '.join(changes[change])}")
+
+    for name, claimants in get_collisions():
+        winner, *others = [f"{namespace}:{entry}" for namespace, entry in claimants]
+        global_echo(f"Warning: '{name}' is claimed by multiple scripts; using {winner}, ignoring {', '.join(others)}.")
+
+    if reload_shell:
+        path_dirs = os.environ.get("PATH", "").split(os.pathsep)
+        if BIN_DIR not in path_dirs:
+            global_echo(f"Warning: {BIN_DIR} is not in your PATH.")
+            if click.confirm("Would you like to add it temporarily and reload your shell now?"):
+                os.environ["PATH"] = BIN_DIR + os.pathsep + os.environ.get("PATH", "")
+                shell = os.environ.get("SHELL", "/bin/sh")
+                global_echo("Reloading shell...")
+                os.execvp(shell, [shell, "-l"])
+            else:
+                global_echo("Please add the following line to your shell configuration to use the shims immediately:")
+                global_echo(f"  export PATH={BIN_DIR}:$PATH")
+
+def load_state(path):
+    """Load a marshal-encoded state dict from path, or return an empty dict."""
+    try:
+        with open(path, "rb") as f:
+            state = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+def dependencies_fingerprint(metadata):
+    """Return a fingerprint of a script's dependency set."""
+    import hashlib
+
+    dependencies = metadata.get("dependencies") or []
+    return hashlib.sha256(repr(sorted(str(dep) for dep in dependencies)).encode("utf-8")).hexdigest()
+
+def warm_script(script_path):
+    """
+    Build and cache the uv environment of a script without running it.
+
+    Returns (elapsed, error), where error is None on success.
+    """
+    import subprocess
+
+    start_time = time.time()
+    try:
+        result = subprocess.run(
+            ["uv", "sync", "--quiet", "--script", script_path],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True,
+        )
+    except OSError as e:
+        return time.time() - start_time, str(e)
+    elapsed = time.time() - start_time
+    if result.returncode != 0:
+        return elapsed, result.stderr.strip() or f"uv exited with code {result.returncode}"
+    return elapsed, None
+
+def warm_scripts(entries, jobs=WARM_JOBS, force=False, log=print):
+    """
+    Pre-build the uv environments of (name, script_path, metadata) entries concurrently.
+
+    Scripts without dependencies, and scripts whose dependency set is unchanged since
+    they were last warmed, are skipped unless force is set. Returns the number of
+    scripts that failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    state = load_state(WARM_STATE_PATH)
+    pending = {}
+    for name, script_path, metadata in entries:
+        if not metadata or not metadata.get("dependencies"):
+            log(f"  {name}: no dependencies")
+            continue
+        fingerprint = dependencies_fingerprint(metadata)
+        if not force and state.get(script_path) == fingerprint:
+            log(f"  {name}: unchanged, skipped")
+            continue
+        pending[script_path] = (name, fingerprint)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {executor.submit(warm_script, script_path): script_path for script_path in pending}
+        for future in as_completed(futures):
+            script_path = futures[future]
+            name, fingerprint = pending[script_path]
+            elapsed, error = future.result()
+            if error:
+                failed += 1
+                log(f"  {name}: failed after {elapsed:.2f}s: {error}")
+            else:
+                state[script_path] = fingerprint
+                log(f"  {name}: warmed in {elapsed:.2f}s")
+
+    # Forget scripts that are no longer installed.
+    state = {path: fingerprint for path, fingerprint in state.items() if os.path.exists(path)}
+    write_atomic(WARM_STATE_PATH, marshal.dumps(state))
+    return failed
+
+def warm_in_background(commands):
+    """Start `act warm` for the given commands in a detached background process."""
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, path_to_self(), "-q", "warm"] + list(commands),
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+def script_interpreter(script_path):
+    """
+    Return the Python interpreter of a script's (already built) uv environment.
+
+    Returns None if uv can't tell, in which case the script should be run with 'uv run'.
+    """
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["uv", "python", "find", "--script", script_path],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    interpreter = result.stdout.strip()
+    if result.returncode != 0 or not os.path.isfile(interpreter):
+        return None
+    return interpreter
+
+def map_script(entry, inputs, jobs=MAP_JOBS, group=False):
+    """
+    Run a script once per input, with at most jobs runs at a time.
+
+    entry is the (namespace, script_path, metadata) tuple of the script; each input
+    is passed as its only argument. The script's environment is built and resolved
+    once up front, so the runs start its interpreter directly instead of going
+    through 'uv run'. Output lines are prefixed with their input as they arrive,
+    or with group set, printed in one block per run when it finishes.
+
+    Returns a list of (input, exit code, elapsed) in input order.
+    """
+    import subprocess
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    namespace, script_path, metadata = entry
+    name = (metadata or {}).get("command") or os.path.splitext(os.path.basename(script_path))[0]
+    command = ["uv", "run", "--quiet", script_path]
+    if metadata and metadata.get("dependencies"):
+        _, error = warm_script(script_path)
+        if error:
+            raise RuntimeError(f"Failed to build the environment of '{name}': {error}")
+    interpreter = script_interpreter(script_path)
+    if interpreter:
+        command = [interpreter, script_path]
+    output_lock = threading.Lock()
+
+    def run_one(value):
+        start_time = time.time()
+        process = subprocess.Popen(
+            command + [value], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+        lines = []
+        for line in process.stdout:
+            line = line.decode("utf-8", "replace").rstrip("\n")
+            if group:
+                lines.append(line)
+            else:
+                with output_lock:
+                    print(f"[{value}] {line}", flush=True)
+        returncode = process.wait()
+        elapsed = time.time() - start_time
+        if lines:
+            with output_lock:
+                print(f"==> {value} <==", *lines, sep="\n", flush=True)
+        record_run(namespace, name, script_path, [value], elapsed, returncode, None)
+        return value, returncode, elapsed
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return list(executor.map(run_one, inputs))
+
+def splice_relay(src, dst, counts, index):
+    """
+    Move data from pipe src to pipe dst inside the kernel until EOF, counting the bytes.
+
+    Both fds are closed when done. If the reader of dst goes away, src is closed so
+    that the writer gets EPIPE/SIGPIPE, as it would with a direct pipe.
+    """
+    try:
+        while True:
+            try:
+                moved = os.splice(src, dst, 1 << 16)
+            except BrokenPipeError:
+                break
+            if not moved:
+                break
+            counts[index] += moved
+    finally:
+        os.close(src)
+        os.close(dst)
+
+def run_pipeline(stages):
+    """
+    Run scripts concurrently with each one's stdout connected to the next one's stdin.
+
+    stages is a list of (entry, args), where entry is the (namespace, script_path,
+    metadata) tuple of a script. The first stage reads act's stdin and the last one
+    writes to act's stdout. Where os.splice is available, each pipe goes through a
+    relay thread that moves the data inside the kernel and counts it; otherwise the
+    stages are connected directly and the byte counts are None.
+
+    Returns a list of (exit code, elapsed, bytes written to the next stage) per stage.
+    """
+    import subprocess
+    import threading
+
+    count_bytes = hasattr(os, "splice")
+    counts = [0] * len(stages)
+    processes = []
+    relays = []
+    stdin = None
+    start_time = time.time()
+    try:
+        for index, (entry, args) in enumerate(stages):
+            last = index == len(stages) - 1
+            read_fd, write_fd = (None, None) if last else os.pipe()
+            processes.append(subprocess.Popen(["uv", "run", "--quiet", entry[1]] + list(args), stdin=stdin, stdout=write_fd))
+            for fd in (stdin, write_fd):
+                if fd is not None:
+                    os.close(fd)
+            stdin = read_fd
+            if count_bytes and not last:
+                stdin, relay_write_fd = os.pipe()
+                relay = threading.Thread(target=splice_relay, args=(read_fd, relay_write_fd, counts, index), daemon=True)
+                relay.start()
+                relays.append(relay)
+    except BaseException:
+        for process in processes:
+            process.kill()
+        raise
+
+    results = [None] * len(stages)
+
+    def wait(index):
+        returncode = processes[index].wait()
+        results[index] = (returncode, time.time() - start_time)
+
+    waiters = [threading.Thread(target=wait, args=(index,), daemon=True) for index in range(len(stages))]
+    for thread in waiters:
+        thread.start()
+    for thread in waiters + relays:
+        while thread.is_alive():
+            try:
+                thread.join()
+            except KeyboardInterrupt:
+                # The stages received the same SIGINT; wait for them to exit.
+                continue
+
+    for (entry, args), (returncode, elapsed) in zip(stages, results):
+        namespace, script_path, metadata = entry
+        name = (metadata or {}).get("command") or os.path.splitext(os.path.basename(script_path))[0]
+        record_run(namespace, name, script_path, args, elapsed, returncode, None)
+    return [
+        (returncode, elapsed, counts[index] if count_bytes and index < len(stages) - 1 else None)
+        for index, (returncode, elapsed) in enumerate(results)
+    ]
+
+def record_run(namespace, command, script_path, args, elapsed, returncode, rusage):
+    """
+    Append a record of a finished run to the run history.
+
+    Each record is a single tab-separated line written with one O_APPEND write, so
+    concurrent runs never interleave. Once the file grows past HISTORY_MAX_BYTES it
+    is rotated under an exclusive lock. Failures to record are ignored.
+
+    The script's version is identified by the mtime (in seconds) and size it had,
+    much like the index tells whether a script changed, so recording a run never has
+    to read the script. Shims record their runs in the same format (see shim_contents).
+    """
+    try:
+        st = os.stat(script_path)
+        version = f"{int(st.st_mtime)}-{st.st_size}"
+    except OSError:
+        version = "-"
+    max_rss = 0
+    if rusage:
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    line = "\t".join(str(field) for field in (
+        f"{time.time():.3f}", command, namespace, version, len(args), f"{elapsed:.4f}", returncode, max_rss,
+    )) + "\n"
+    try:
+        fd = os.open(HISTORY_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > HISTORY_MAX_BYTES:
+            rotate_history()
+    except OSError:
+        pass
+
+def rotate_history():
+    """
+    Rotate the run history, unless another process is already doing so.
+
+    The lock is a directory rather than an flock, so that shims can take it too.
+    """
+    lock = HISTORY_PATH + ".rotating"
+    try:
+        os.mkdir(lock)
+    except OSError:
+        return
+    try:
+        # Another process may have rotated the file since we checked its size.
+        if os.path.getsize(HISTORY_PATH) > HISTORY_MAX_BYTES:
+            os.replace(HISTORY_PATH, HISTORY_PATH + ".1")
+    finally:
+        os.rmdir(lock)
+
+def read_history():
+    """Return the recorded runs, oldest first, as a list of dicts."""
+    runs = []
+    for path in (HISTORY_PATH + ".1", HISTORY_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 8:
+                continue
+            try:
+                runs.append({
+                    "time": float(fields[0]),
+                    "command": fields[1],
+                    "namespace": fields[2],
+                    "hash": fields[3],
+                    "args": int(fields[4]),
+                    "elapsed": float(fields[5]),
+                    "returncode": int(fields[6]),
+                    "max_rss": int(fields[7]),
+                })
+            except ValueError:
+                continue
+    runs.sort(key=lambda run: run["time"])
+    return runs
+
+def run_stats(runs):
+    """
+    Summarize the runs of one command.
+
+    Returns counts, failure rate, latency percentiles and, if the latest version of
+    the script is noticeably slower than the previous one, the regression ratio.
+    """
+    latencies = [run["elapsed"] for run in runs]
+    failures = sum(1 for run in runs if run["returncode"] != 0)
+    stats = {
+        "runs": len(runs),
+        "failure_rate": failures / len(runs),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "regression": None,
+    }
+
+    # Compare the latest version of the script with the version before it.
+    latest_hash = runs[-1]["hash"]
+    latest = [run["elapsed"] for run in runs if run["hash"] == latest_hash]
+    older = [run for run in runs if run["hash"] != latest_hash]
+    if older:
+        previous = [run["elapsed"] for run in older if run["hash"] == older[-1]["hash"]]
+        if len(latest) >= REGRESSION_MIN_RUNS and len(previous) >= REGRESSION_MIN_RUNS:
+            ratio = percentile(latest, 50) / max(percentile(previous, 50), 1e-9)
+            if ratio >= REGRESSION_THRESHOLD:
+                stats["regression"] = ratio
+    return stats
+
+def percentile(values, pct):
+    """Return the pct-th percentile of values, interpolating between samples."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+def summarize(values):
+    """Return min/median/p95 of a list of values."""
+    return {"min": min(values), "median": percentile(values, 50), "p95": percentile(values, 95)}
+
+def measure_command(argv, repeat, env=None):
+    """
+    Run argv repeat times with stdout discarded and return (wall, cpu) samples in seconds.
+
+    CPU time is the user plus system time of the child and the processes it waited for.
+    Raises RuntimeError if the command fails.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pid = os.posix_spawnp(
+            argv[0], argv, os.environ if env is None else env,
+            file_actions=[(os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0)],
+        )
+        _, status, rusage = os.wait4(pid, 0)
+        wall = time.perf_counter() - start
+        returncode = os.waitstatus_to_exitcode(status)
+        if returncode != 0:
+            raise RuntimeError(f"'{' '.join(argv)}' failed with exit code {returncode}")
+        samples.append((wall, rusage.ru_utime + rusage.ru_stime))
+    return samples
+
+def create_synthetic_home(act_dir, size):
+    """
+    Create an act base directory in act_dir with helloworld plus size synthetic community scripts.
+
+    Returns the path to the helloworld script.
+    """
+    community_dir = os.path.join(act_dir, "community")
+    os.makedirs(community_dir, exist_ok=True)
+    for i in range(size):
+        with open(os.path.join(community_dir, f"synthetic-{i}.py"), "w", encoding="utf-8") as f:
+            f.write(SYNTHETIC_SCRIPT.format(command=f"synthetic-{i}"))
+    helloworld_path = os.path.join(community_dir, "helloworld.py")
+    with open(helloworld_path, "w", encoding="utf-8") as f:
+        f.write(SYNTHETIC_SCRIPT.format(command="helloworld"))
+    return helloworld_path
+
+def run_benchmarks(repeat, size, log=print):
+    """
+    Measure the launch latency of helloworld run directly, through uv, through
+    `act run` and through its shim, against a synthetic set of size scripts.
+
+    act is launched the way its wrapper and the shims launch it, with `uv run`. The
+    synthetic scripts live in a temporary ACT_HOME; HOME is left alone, so uv uses
+    its usual cache and Python installations.
+
+    Returns a JSON-serializable dict of results.
+    """
+    import shutil
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="act-bench-") as act_dir:
+        helloworld_path = create_synthetic_home(act_dir, size)
+        bin_dir = os.path.join(act_dir, "bin")
+        env = dict(os.environ, ACT_HOME=act_dir, PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""))
+        act = ["uv", "run", "--quiet", path_to_self(), "-q"]
+
+        cases = [("python", [sys.executable, helloworld_path])]
+        if shutil.which("uv"):
+            cases += [
+                ("uv run", ["uv", "run", "--quiet", helloworld_path]),
+                ("act run", act + ["run", "helloworld"]),
+                ("shim", [os.path.join(bin_dir, "helloworld")]),
+            ]
+            measure_command(act + ["link"], 1, env=env)
+        else:
+            log("uv not found; only measuring python.")
+
+        for name, argv in cases:
+            log(f"Measuring {name}...")
+            # Warm up caches (uv environments, the act index) before measuring.
+            measure_command(argv, 1, env=env)
+            samples = measure_command(argv, repeat, env=env)
+            results[name] = {
+                "wall": summarize([wall for wall, _ in samples]),
+                "cpu": summarize([cpu for _, cpu in samples]),
+            }
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "repeat": repeat,
+        "scripts": size + 1,
+        "results": results,
+    }
+
+def recv_exact(sock, size):
+    """Receive exactly size bytes from a socket, or raise EOFError."""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+def send_request(sock, request, fds=()):
+    """Send a request dict, and optionally file descriptors, over a Unix socket."""
+    import socket
+
+    payload = repr(request).encode("utf-8")
+    socket.send_fds(sock, [len(payload).to_bytes(4, "big")], list(fds))
+    sock.sendall(payload)
+
+def script_imports(script_path):
+    """Return the absolute modules a script imports at its top level."""
+    import ast
+
+    with open(script_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return modules
+
+def start_zygote(script_path, log=print):
+    """
+    Start a zygote for the dependency set of script_path.
+
+    Returns (process, socket), or None if the zygote failed to start.
+    """
+    import socket
+    import subprocess
+
+    daemon_sock, zygote_sock = socket.socketpair()
+    bootstrap_path = write_bootstrap(script_path, "zygote", ZYGOTE_BOOTSTRAP)
+    process = subprocess.Popen(
+        ["uv", "run", "--quiet", bootstrap_path],
+        pass_fds=[zygote_sock.fileno()],
+        env=dict(os.environ, ACT_ZYGOTE_FD=str(zygote_sock.fileno())),
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+    )
+    zygote_sock.close()
+    daemon_sock.settimeout(ZYGOTE_START_TIMEOUT)
+    try:
+        ready = recv_exact(daemon_sock, 6) == b"ready\n"
+    except (EOFError, OSError):
+        ready = False
+    daemon_sock.settimeout(None)
+    if not ready:
+        log(f"Failed to start a zygote for {script_path}.")
+        process.kill()
+        daemon_sock.close()
+        return None
+    return process, daemon_sock
+
+def serve_forever(log=print):
+    """
+    Run the launcher daemon on SERVE_SOCKET until it receives a stop request.
+
+    The daemon keeps one zygote per dependency set: an interpreter started with
+    'uv run' in that set's environment, which imports the modules of the scripts
+    it runs and forks a worker per request. Clients (run_via_server) send the
+    script, argv, cwd and environment along with their stdin/stdout/stderr via
+    SCM_RIGHTS. The daemon hands those and the client connection to the zygote,
+    whose worker reports its pid and exit status straight to the client.
+    """
+    import socket
+    import threading
 
-def fetch_community_script(script_name):
-    url = f"{REPO_URL_BASE}/{script_name}.py"
     try:
-        with urllib.request.urlopen(url) as response:
-            return response.read().decode("utf-8")
-    except Exception as e:
-        raise click.ClickException(f"Failed to download script: {e}")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(SERVE_SOCKET)
+        raise RuntimeError(f"act serve is already running on {SERVE_SOCKET}.")
+    except (FileNotFoundError, ConnectionRefusedError):
+        if os.path.exists(SERVE_SOCKET):
+            os.remove(SERVE_SOCKET)
 
-    # For development purposes, install the script from the local directory.
-    # with open(f"./community-scripts/{script_name}.py", "r") as f:
-    #     return f.read()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(SERVE_SOCKET)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
 
-def sanitize_script_name(script_name):
-    """Enforce alphanumeric characters, dashes, and underscores only."""
-    return "".join(c for c in script_name if c.isalnum() or c in "-_")
+    # Each dependency set has a slot of [lock, (process, socket) or None]. The slot's
+    # lock is held while its zygote starts and while a request is handed to it, so a
+    # slow start only holds up requests for the same dependency set.
+    zygotes = {}
+    zygotes_lock = threading.Lock()
+    # Parsed header and top-level imports per script path, keyed by (mtime, size)
+    scripts = {}
+    stopping = threading.Event()
 
-def path_to_self():
-    """Return the path to the act.py script."""
-    return os.path.abspath(__file__)
+    def describe_script(script_path):
+        st = os.stat(script_path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = scripts.get(script_path)
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+        metadata = parse_script_metadata(script_path)
+        imports = script_imports(script_path)
+        scripts[script_path] = (key, metadata, imports)
+        return metadata, imports
 
-def ensure_scripts_dir():
-    """Ensure that all required directories exist."""
-    os.makedirs(LOCAL_SCRIPTS_DIR, exist_ok=True)
-    os.makedirs(COMMUNITY_SCRIPTS_DIR, exist_ok=True)
-    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    def run_in_zygote(script_path, metadata, request, fds):
+        # Hand a request to the zygote of the script's dependency set, starting it
+        # if needed. Returns False if the zygote could not be started.
+        fingerprint = dependencies_fingerprint(metadata)
+        with zygotes_lock:
+            slot = zygotes.setdefault(fingerprint, [threading.Lock(), None])
+        with slot[0]:
+            if not slot[1] or slot[1][0].poll() is not None:
+                started = time.time()
+                log(f"Starting zygote {fingerprint[:8]} for {os.path.basename(script_path)}...")
+                slot[1] = start_zygote(script_path, log=log)
+                if not slot[1]:
+                    return False
+                log(f"Zygote {fingerprint[:8]} ready in {time.time() - started:.2f}s.")
+            send_request(slot[1][1], request, fds)
+        return True
 
-def parse_header(file_content: str) -> dict:
+    def handle(conn):
+        fds = []
+        try:
+            header, fds, _, _ = socket.recv_fds(conn, 4, 3)
+            if not header:
+                return
+            import ast
+
+            request = ast.literal_eval(recv_exact(conn, int.from_bytes(header, "big")).decode("utf-8"))
+            if request.get("stop"):
+                stopping.set()
+                # Wake up the accept() in the main loop.
+                server.shutdown(socket.SHUT_RDWR)
+                return
+            script_path = request["script"]
+            metadata, request["preload"] = describe_script(script_path)
+            if len(fds) != 3 or not run_in_zygote(script_path, metadata, request, fds + [conn.fileno()]):
+                conn.sendall(b"fallback\n")
+                return
+            log(f"Running {script_path} {' '.join(request['argv'])}")
+        except Exception as e:
+            log(f"Request failed: {e}")
+            try:
+                conn.sendall(b"fallback\n")
+            except OSError:
+                pass
+        finally:
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+
+    log(f"act serve listening on {SERVE_SOCKET}")
+    try:
+        while not stopping.is_set():
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                break
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    finally:
+        server.close()
+        if os.path.exists(SERVE_SOCKET):
+            os.remove(SERVE_SOCKET)
+        for _, zygote in zygotes.values():
+            if zygote:
+                zygote[1].close()
+                zygote[0].terminate()
+        log("act serve stopped.")
+
+def stop_server():
+    """Ask a running `act serve` daemon to stop. Returns False if none is running."""
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(SERVE_SOCKET)
+            send_request(conn, {"stop": True})
+    except OSError:
+        return False
+    return True
+
+def secho(message, fg=None, err=False):
+    """Print a message, colored if the stream is a terminal (like click.secho)."""
+    stream = sys.stderr if err else sys.stdout
+    if fg and stream.isatty():
+        message = f"\033[{ANSI_COLORS[fg]}m{message}\033[0m"
+    print(message, file=stream, flush=True)
+
+def spawn_and_wait(argv, env=None):
     """
-    Parse a header block in the given file content and return a dictionary of its key-value pairs.
-    The header block is expected to be enclosed between lines starting with "# ///".
+    Run argv as a child process and wait for it to exit.
+
+    Returns (exit code, resource usage). The resource usage covers the child and
+    the processes it waited for, and is None where os.wait4 is unavailable. Uses
+    posix_spawn where available to avoid importing subprocess.
     """
-    lines = file_content.splitlines()
-    header_started = False
-    header_lines = []
+    if not hasattr(os, "posix_spawnp"):
+        import subprocess
+        return subprocess.run(argv, env=env).returncode, None
+    pid = os.posix_spawnp(argv[0], argv, os.environ if env is None else env)
+    while True:
+        try:
+            _, status, rusage = os.wait4(pid, 0)
+            return os.waitstatus_to_exitcode(status), rusage
+        except KeyboardInterrupt:
+            # The child received the same SIGINT; wait for it to exit.
+            continue
 
-    for line in lines:
-        stripped = line.strip()
-        # Detect header delimiters: lines starting with "# ///"
-        if stripped.startswith("# ///"):
-            if not header_started:
-                header_started = True
-                continue  # skip the starting delimiter line
-            else:
-                # Stop at the ending delimiter
+def read_header_block(script_path):
+    """Return the raw "# /// script" ... "# ///" block of a script, or "" if it has none."""
+    lines = []
+    remaining = MAX_HEADER_BYTES
+    with open(script_path, "r", encoding="utf-8") as f:
+        while remaining > 0:
+            line = f.readline(remaining)
+            if not line:
                 break
+            remaining -= len(line)
+            stripped = line.strip()
+            if lines:
+                lines.append(line)
+                if stripped.startswith("# ///"):
+                    return "".join(lines)
+            elif stripped.startswith("# /// script"):
+                lines.append(line)
+    return ""
 
-        if header_started:
-            if stripped.startswith("#"):
-                # Remove the leading '#' and extra whitespace
-                content = stripped[1:].strip()
-                header_lines.append(content)
+def write_bootstrap(script_path, mode, template):
+    """
+    Write a wrapper that runs script_path under instrumentation and return its path.
 
-    header_str = "\n".join(header_lines)
+    The wrapper carries a copy of the script's inline metadata block, so 'uv run'
+    gives it the same dependencies, followed by template formatted with the script
+    path. The script itself is never modified. Each script and mode gets a stable
+    wrapper path that is only rewritten when its contents change.
+    """
+    import hashlib
 
+    contents = (
+        read_header_block(script_path).rstrip("\n")
+        + f"\n# Generated by act to run {script_path} ({mode}).\n"
+        + template.format(script_path=script_path)
+    )
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    digest = hashlib.sha256(script_path.encode("utf-8")).hexdigest()[:12]
+    bootstrap_path = os.path.join(BOOTSTRAP_DIR, f"{name}-{digest}-{mode}.py")
     try:
-        tree = ast.parse(header_str, mode='exec')
-    except SyntaxError as e:
-        raise ValueError("Failed to parse header content") from e
+        with open(bootstrap_path, "r", encoding="utf-8") as f:
+            if f.read() == contents:
+                return bootstrap_path
+    except OSError:
+        os.makedirs(BOOTSTRAP_DIR, exist_ok=True)
+    write_atomic(bootstrap_path, contents)
+    return bootstrap_path
 
-    header_dict = {}
-    for node in tree.body:
-        if isinstance(node, ast.Assign):
-            if len(node.targets) != 1:
-                continue
-            target = node.targets[0]
-            if isinstance(target, ast.Name):
-                key = target.id
-                try:
-                    value = ast.literal_eval(node.value)
-                except Exception as e:
-                    raise ValueError(f"Unable to evaluate value for key '{key}'") from e
-                header_dict[key] = value
+def report_timings(timings, rusage):
+    """Print the per-phase breakdown of `act run --timings` to stderr."""
+    secho("Timings:", fg="yellow", err=True)
+    for phase, seconds in timings.items():
+        secho(f"  {phase:<20} {seconds * 1000:>9.1f}ms", err=True)
+    if rusage:
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        secho(f"  {'max RSS':<20} {max_rss / (1024 * 1024):>9.1f}MB", err=True)
+        secho(f"  {'user CPU':<20} {rusage.ru_utime * 1000:>9.1f}ms", err=True)
+        secho(f"  {'system CPU':<20} {rusage.ru_stime * 1000:>9.1f}ms", err=True)
 
-    return header_dict
+def report_profile(profile, profile_file):
+    """Print the top functions (cpu) or allocation sites (mem) of a profiled run to stderr."""
+    if not os.path.exists(profile_file):
+        secho("No profile was written.", fg="red", err=True)
+        return
+    secho(f"Profile written to {profile_file}", fg="yellow", err=True)
+    if profile == "cpu":
+        import pstats
 
-def parse_script_metadata(file_path):
-    """
-    Parse the inline dependency header of a script file.
-    Returns a dict with keys like 'command', 'aliases', 'author', 'dependencies'.
-    """
-    with open(file_path, "r", encoding="utf-8") as f:
-        return parse_header(f.read())
+        stats = pstats.Stats(profile_file, stream=sys.stderr)
+        stats.sort_stats("tottime").print_stats(PROFILE_TOP_N)
+        return
 
-def find_script(script_identifier):
+    import tracemalloc
+
+    snapshot = tracemalloc.Snapshot.load(profile_file).filter_traces([
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<unknown>"),
+    ])
+    try:
+        with open(profile_file + ".peak", "r", encoding="utf-8") as f:
+            secho(f"Peak traced memory: {int(f.read()) / 1024:.1f} KiB", err=True)
+        os.remove(profile_file + ".peak")
+    except (OSError, ValueError):
+        pass
+    secho(f"Top {PROFILE_TOP_N} allocation sites still allocated at exit:", err=True)
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP_N]:
+        frame = stat.traceback[0]
+        secho(f"  {stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}", err=True)
+
+def run_script(entry, args, quiet=False, timings=None, profile=None):
     """
-    Find a script by its identifier.
+    Run a script with uv, report how it went and return its exit code.
 
-    If the identifier is prefixed with a namespace (e.g. "community:weather" or "local:weather"),
-    the search is limited to that namespace. Without a prefix, the search first looks in local scripts,
-    then in community scripts.
+    entry is the (namespace, script_path, command) tuple of the script, as returned
+    by resolve_script. Every run is recorded in the run history (see record_run), except profiled runs.
 
-    Returns the full path of the script or None if not found.
+    With profile set to "cpu" or "mem", the script runs under cProfile or tracemalloc
+    (through a bootstrap, see write_bootstrap). The profile is written to
+    PROFILES_DIR and summarized after the status line; timings is ignored.
+
+    If timings is a dict (of the phases measured so far, see lookup_timings), the
+    script is launched through a bootstrap that records when its interpreter came up,
+    and a per-phase breakdown is printed after the status line:
+
+    - uv resolve/sync: from launching 'uv run' until the script's interpreter started,
+      minus the interpreter's own startup
+    - interpreter start: CPU time the script's interpreter spent before running the
+      bootstrap, an approximation of its startup time
+    - script runtime: from the bootstrap running until the child exited
     """
-    ensure_scripts_dir()
-    namespace = None
-    command = script_identifier
+    namespace, script_path, name = entry
+    name = name or os.path.splitext(os.path.basename(script_path))[0]
+    command = ['uv', 'run', '--quiet', script_path]
+    env = None
+    if profile:
+        timings = None
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        extension = "pstats" if profile == "cpu" else "snapshot"
+        profile_file = os.path.join(PROFILES_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+        template = CPU_PROFILE_BOOTSTRAP if profile == "cpu" else MEM_PROFILE_BOOTSTRAP
+        command[-1] = write_bootstrap(script_path, f"profile-{profile}", template)
+        env = dict(os.environ, ACT_PROFILE_FILE=profile_file)
+    elif timings is not None:
+        timings_file = os.path.join(BOOTSTRAP_DIR, f".timings-{os.getpid()}")
+        command[-1] = write_bootstrap(script_path, "timings", TIMINGS_BOOTSTRAP)
+        env = dict(os.environ, ACT_TIMINGS_FILE=timings_file)
 
-    if ":" in script_identifier:
-        namespace, command = script_identifier.split(":", 1)
-        namespace = namespace.lower()
+    start_time = time.time()
+    # Use the `act serve` daemon if it is running, unless the run is instrumented.
+    returncode, rusage = (run_via_server(script_path, args) if env is None else None), None
+    if returncode is None:
+        # Run the script with any additional arguments (using 'uv run' as in the original code)
+        returncode, rusage = spawn_and_wait(command + list(args), env=env)
+    end_time = time.time()
+    elapsed = end_time - start_time
+    if returncode == 0:
+        # Only show success message if not globally suppressed.
+        if not quiet:
+            secho(f"Done in {elapsed:.2f}s.", fg="green")
+    else:
+        secho(f"Failed with exit code {returncode}.", fg="red")
 
-    if namespace == "local":
-        directories = [LOCAL_SCRIPTS_DIR]
-    elif namespace == "community":
-        directories = [COMMUNITY_SCRIPTS_DIR]
+    if profile:
+        report_profile(profile, profile_file)
     else:
-        directories = [LOCAL_SCRIPTS_DIR, COMMUNITY_SCRIPTS_DIR]
+        record_run(namespace, name, script_path, args, elapsed, returncode, rusage)
 
-    for directory in directories:
-        for entry in os.listdir(directory):
-            if entry.endswith(".py"):
-                script_path = os.path.join(directory, entry)
-                try:
-                    metadata = parse_script_metadata(script_path)
-                except Exception:
-                    continue
-                if metadata.get("command") == command:
-                    return script_path
-                aliases = metadata.get("aliases", [])
-                if isinstance(aliases, list) and command in aliases:
-                    return script_path
-    return None
+    if timings is not None:
+        try:
+            with open(timings_file, "r", encoding="utf-8") as f:
+                child_started, child_cpu = (float(value) for value in f.read().split())
+            os.remove(timings_file)
+        except (OSError, ValueError):
+            timings["uv run (total)"] = elapsed
+        else:
+            timings["uv resolve/sync"] = max(0.0, child_started - start_time - child_cpu)
+            timings["interpreter start"] = child_cpu
+            timings["script runtime"] = end_time - child_started
+        report_timings(timings, rusage)
+    return returncode
 
-def create_bin_shims():
+def timings_requested():
+    """Return True if the ACT_TIMINGS environment variable asks for a timing breakdown."""
+    return os.environ.get("ACT_TIMINGS", "") not in ("", "0")
+
+def process_started_at():
     """
-    Clear the bin shims and recreate shims for all installed scripts.
+    Return the wall-clock time act was started at, for the "act startup" phase.
 
-    This function scans both the local and community script directories,
-    removes any existing shim files in the global BIN_DIR, and creates new
-    shim executables for each script. If both a local and a community script
-    share the same command name, the local version takes precedence.
-    
-    Returns a list of the created shim paths.
+    A shim run with ACT_TIMINGS set exports the time it started in ACT_SHIM_STARTED,
+    which also covers uv launching act. Otherwise, on Linux, the start time of this
+    process is read from /proc (to the kernel's clock tick, usually 10ms). Failing
+    both, this is when act's module started executing, which misses the interpreter's
+    startup and imports.
     """
-    os.makedirs(BIN_DIR, exist_ok=True)
+    try:
+        return float(os.environ.pop("ACT_SHIM_STARTED"))
+    except (KeyError, ValueError):
+        pass
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Fields after the command name, which is in parentheses and may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.time() - (time.clock_gettime(time.CLOCK_BOOTTIME) - started)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return ACT_STARTED_AT
 
-    # Clear existing shims.
-    for filename in os.listdir(BIN_DIR):
-        if filename == "act":
-            continue
-        file_path = os.path.join(BIN_DIR, filename)
-        if os.path.isfile(file_path):
-            os.remove(file_path)
+def lookup_timings(lookup_start, lookup_phases):
+    """
+    Return the timing phases of act itself, measured until the script was found.
 
-    # Collect installed scripts.
-    # Build a dictionary mapping command names to their namespace.
-    scripts = {}
+    lookup_phases is the dict find_script_entry was given. The header parse phase is
+    only reported if the lookup had to parse headers, and is not counted in the
+    script lookup phase.
+    """
+    parse = lookup_phases.get("header parse")
+    timings = {
+        "act startup": lookup_start - process_started_at(),
+        "script lookup": time.time() - lookup_start - (parse or 0.0),
+    }
+    if parse is not None:
+        timings["header parse"] = parse
+    return timings
 
-    for directory, namespace in [(LOCAL_SCRIPTS_DIR, "local"), (COMMUNITY_SCRIPTS_DIR, "community")]:
-        if not os.path.exists(directory):
-            continue
-        for entry in os.listdir(directory):
-            if entry.endswith(".py"):
-                script_path = os.path.join(directory, entry)
-                try:
-                    metadata = parse_script_metadata(script_path)
-                except Exception:
-                    continue
-                command = metadata.get("command")
-                if not command or command == "act":
-                    continue
-                # If a local script with the same command exists, skip the community version.
-                if command in scripts and scripts[command]["namespace"] == "local":
-                    continue
-                scripts[command] = {"identifier": command, "namespace": namespace}
+def run_via_server(script_path, args):
+    """
+    Run a script through the `act serve` daemon if it is running.
 
-    if not scripts:
+    Passes this process's stdin/stdout/stderr, argv, cwd and environment to the
+    daemon and relays SIGINT to the worker. Returns the script's exit code, or
+    None if the daemon is not available (the caller then runs the script itself).
+    """
+    if not os.path.exists(SERVE_SOCKET):
         return None
+    import socket
 
-    created_shims = []
+    if not hasattr(socket, "send_fds"):
+        return None
+    request = {"script": script_path, "argv": list(args), "cwd": os.getcwd(), "env": dict(os.environ)}
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(SERVE_SOCKET)
+        send_request(conn, request, [0, 1, 2])
+        reader = conn.makefile("rb")
+    except OSError:
+        return None
 
-    for command, info in scripts.items():
-        shim_path = os.path.join(BIN_DIR, command)
-        script_path = path_to_self()
-        with open(shim_path, "w", encoding="utf-8") as shim_file:
-            # The shim forwards all arguments to "act run <command>".
-            contents=f"""#!/bin/sh
-uv run -q {script_path} run {command} -- "$@"
-"""
-            shim_file.write(contents)
-        os.chmod(shim_path, 0o755)
-        created_shims.append(shim_path)
+    pid = None
+    with conn, reader:
+        while True:
+            try:
+                line = reader.readline()
+            except KeyboardInterrupt:
+                if pid:
+                    import signal
+                    os.kill(pid, signal.SIGINT)
+                continue
+            except OSError:
+                line = b""
+            if not line:
+                # The daemon went away: before the script started, run it ourselves.
+                return None if pid is None else 1
+            kind, _, value = line.decode("utf-8").strip().partition(" ")
+            if kind == "pid":
+                pid = int(value)
+            elif kind == "exit":
+                return int(value)
+            elif kind == "fallback":
+                return None
 
-    return created_shims
+def exec_script(script_path, args):
+    """Run a script through the `act serve` daemon, or replace this process with 'uv run'."""
+    returncode = run_via_server(script_path, args)
+    if returncode is None:
+        os.execvp("uv", ["uv", "run", "-q", script_path] + list(args))
+    sys.exit(returncode)
 
-def update_shims(reload_shell=False):
+def fast_main(argv):
     """
-    Update the bin shims by clearing and recreating them.
+    Handle `act [-q] run <identifier> [args]` without importing click.
 
-    If reload_shell is True and BIN_DIR is not in the current PATH,
-    the user is prompted to add BIN_DIR to PATH and reload the shell.
+    Exits with the script's exit code if the invocation was handled. Returns if it
+    needs the full CLI: other commands, options such as --help, the interactive
+    picker, or a script that cannot be found (so click reports the error).
     """
-    created_shims = create_bin_shims()
-    if not created_shims:
-        global_echo("No installed scripts found to link.")
+    if argv[:1] == ["--exec"] and len(argv) >= 2:
+        # Used by shims while `act serve` is running.
+        exec_script(argv[1], argv[2:])
+
+    quiet = False
+    if argv and argv[0] in ("-q", "--quiet"):
+        quiet = True
+        argv = argv[1:]
+    if len(argv) < 2 or argv[0] != "run" or argv[1].startswith("-"):
+        return
+
+    script_identifier, args = argv[1], argv[2:]
+    # Like click, treat everything after "--" as arguments and anything before it
+    # that looks like an option as an option of `run`.
+    if "--" in args:
+        split = args.index("--")
+        before, after = args[:split], args[split + 1:]
     else:
-        global_echo(f"Successfully recreated shims for {len(created_shims)} scripts in '{BIN_DIR}'.")
+        before, after = args, []
+    if any(arg.startswith("-") and arg != "-" for arg in before):
+        return
 
-    if reload_shell:
-        path_dirs = os.environ.get("PATH", "").split(os.pathsep)
-        if BIN_DIR not in path_dirs:
-            global_echo(f"Warning: {BIN_DIR} is not in your PATH.")
-            if click.confirm("Would you like to add it temporarily and reload your shell now?"):
-                os.environ["PATH"] = BIN_DIR + os.pathsep + os.environ.get("PATH", "")
-                shell = os.environ.get("SHELL", "/bin/sh")
-                global_echo("Reloading shell...")
-                os.execvp(shell, [shell, "-l"])
-            else:
-                global_echo("Please add the following line to your shell configuration to use the shims immediately:")
-                global_echo(f"  export PATH={BIN_DIR}:$PATH")
+    lookup_phases = {} if timings_requested() else None
+    lookup_start = time.time()
+    entry = resolve_script(script_identifier, lookup_phases)
+    if not entry:
+        return
+    timings = lookup_timings(lookup_start, lookup_phases) if lookup_phases is not None else None
+    sys.exit(run_script(entry, before + after, quiet=quiet, timings=timings))
+
+# Dispatch `act run` before click is imported and the CLI is built.
+if __name__ == "__main__":
+    fast_main(sys.argv[1:])
+
+import click  # noqa: E402
 
 # Add helper to conditionally echo messages.
 def global_echo(message, **kwargs):
@@ -252,14 +2377,19 @@ def cli(ctx, quiet):
     ensure_scripts_dir()
 
 @cli.command()
-def link():
+@click.option("--via-act", is_flag=True, help="Route shims through 'act run' to always report timing and exit codes.")
+def link(via_act):
     """
-    Clear the bin shims and recreate shims for all installed scripts.
+    Create, update and remove bin shims to match the installed scripts.
+
+    Shims launch their script directly with uv. Set ACT_REPORT=1 when calling a
+    shim, or link with --via-act, to run it through 'act run' instead.
 
     After linking, if the global bin directory is not in your PATH, you'll be
     offered the chance to add it temporarily and reload your shell.
     """
-    update_shims(reload_shell=True)
+    update_shims(reload_shell=True, via_act=via_act)
+    write_completion_cache("subcommands", cli.commands)
 
 @cli.command()
 @click.argument("script_name", required=False)
@@ -289,6 +2419,8 @@ def create(script_name):
     with open(script_path, "w", encoding="utf-8") as f:
         f.write(template)
     global_echo(f"Local script '{script_name}' created at {script_path}")
+    # A new local script may shadow a community script, so relink the shims.
+    update_shims(reload_shell=False)
     ctx = click.get_current_context()
     ctx.invoke(edit, script_identifier=script_name)
 
@@ -322,12 +2454,18 @@ def edit(script_identifier):
             # Use gedit on Linux as default GUI editor
             editor_cmd = ["gedit"]
 
+    import subprocess
     subprocess.run(editor_cmd + [script_path])
 
 @cli.command()
 @click.argument("script_identifier", required=False)
 @click.argument("args", nargs=-1)
-def run(script_identifier, args):
+@click.option("--timings", is_flag=True, help="Print a per-phase timing breakdown (also enabled by ACT_TIMINGS=1).")
+@click.option(
+    "--profile", is_flag=False, flag_value="cpu", default=None, metavar="[cpu|mem]",
+    help="Profile the script with cProfile (cpu, the default) or tracemalloc (mem).",
+)
+def run(script_identifier, args, timings, profile):
     """
     Run a script.
 
@@ -337,23 +2475,22 @@ def run(script_identifier, args):
 
     The search first checks local scripts, then community scripts.
     """
+    if profile not in (None, "cpu", "mem"):
+        # click reads "--profile weather" as "--profile=weather": shift it back.
+        if script_identifier:
+            args = (script_identifier,) + args
+        script_identifier, profile = profile, "cpu"
+    if timings and profile:
+        raise click.ClickException("--timings and --profile cannot be used together.")
+    lookup_phases = {} if not profile and (timings or timings_requested()) else None
+    lookup_start = time.time()
     if not script_identifier:
-        ensure_scripts_dir()
         scripts = []
-        # Collect local scripts
-        for entry in os.listdir(LOCAL_SCRIPTS_DIR):
-            if entry.endswith(".py"):
-                script_path = os.path.join(LOCAL_SCRIPTS_DIR, entry)
-                metadata = parse_script_metadata(script_path)
-                command = metadata.get("command", entry)
-                scripts.append(("local:" + command, script_path))
-        # Collect community scripts
-        for entry in os.listdir(COMMUNITY_SCRIPTS_DIR):
-            if entry.endswith(".py"):
-                script_path = os.path.join(COMMUNITY_SCRIPTS_DIR, entry)
-                metadata = parse_script_metadata(script_path)
-                command = metadata.get("command", entry)
-                scripts.append(("community:" + command, script_path))
+        # Collect local scripts, then community scripts
+        for entry in iter_scripts():
+            namespace, script_path, metadata = entry
+            command = (metadata or {}).get("command", os.path.basename(script_path))
+            scripts.append((f"{namespace}:{command}", (namespace, script_path, (metadata or {}).get("command"))))
         if not scripts:
             raise click.ClickException("No installed scripts found.")
         global_echo("Installed scripts:")
@@ -362,23 +2499,14 @@ def run(script_identifier, args):
         choice = click.prompt("Enter the number of the script to run", type=int)
         if choice < 1 or choice > len(scripts):
             raise click.ClickException("Invalid selection.")
-        script_identifier, script_path = scripts[choice - 1]
+        script_identifier, entry = scripts[choice - 1]
     else:
-        script_path = find_script(script_identifier)
-        if not script_path:
+        entry = resolve_script(script_identifier, lookup_phases)
+        if not entry:
             raise click.ClickException(f"Script '{script_identifier}' not found.")
-    start_time = time.time()
-    # Run the script with any additional arguments (using 'uv run' as in the original code)
-    result = subprocess.run(['uv', 'run', '--quiet', script_path] + list(args))
-    elapsed = time.time() - start_time
-    if result.returncode == 0:
-        # Only show success message if not globally suppressed.
-        ctx = click.get_current_context()
-        if not (ctx and ctx.obj and ctx.obj.get("quiet")):
-            click.secho(f"Done in {elapsed:.2f}s.", fg="green")
-    elif result.returncode != 0:
-        click.secho(f"Failed with exit code {result.returncode}.", fg="red")
-    sys.exit(result.returncode)
+    phases = lookup_timings(lookup_start, lookup_phases) if lookup_phases is not None else None
+    ctx = click.get_current_context()
+    sys.exit(run_script(entry, args, quiet=bool(ctx.obj and ctx.obj.get("quiet")), timings=phases, profile=profile))
 
 @cli.command()
 @click.argument("script_identifier")
@@ -393,89 +2521,492 @@ def delete(script_identifier):
         raise click.ClickException(f"Script '{script_identifier}' not found.")
     os.remove(script_path)
     click.echo(f"Script '{script_identifier}' deleted.")
+    # Drop the shim, or point it at the script that was shadowed by this one.
+    update_shims(reload_shell=False)
 
 @cli.command(name="list")
-def list_scripts():
+@click.option("-a", "--available", is_flag=True, help="List the scripts available in the community repository.")
+@click.option("--json", "as_json", is_flag=True, help="Print the scripts as JSON.")
+def list_scripts(available, as_json):
     """
     List all available scripts, grouped by namespace.
     """
-    ensure_scripts_dir()
+    if available:
+        manifest = fetch_manifest()
+        if manifest is None:
+            raise click.ClickException("Failed to fetch the community script manifest.")
+        installed = {os.path.basename(path) for _, path, _ in iter_scripts(["community"])}
+        if as_json:
+            import json
+
+            scripts = [dict(script, installed=f"{script['name']}.py" in installed) for script in manifest]
+            click.echo(json.dumps(scripts, indent=2))
+            return
+        global_echo("Community repository:")
+        for script in manifest:
+            marker = "*" if f"{script['name']}.py" in installed else " "
+            global_echo(f"{marker} {script['command']:<16} {script.get('description') or ''}")
+        global_echo("(* installed)")
+        return
+
+    if as_json:
+        import json
+
+        scripts = [
+            script_info(namespace, script_path, metadata) for namespace, script_path, metadata in iter_scripts()
+        ]
+        click.echo(json.dumps(scripts, indent=2))
+        return
+
     found = False
-    global_echo("Local scripts:")
-    for entry in os.listdir(LOCAL_SCRIPTS_DIR):
-        if entry.endswith(".py"):
-            script_path = os.path.join(LOCAL_SCRIPTS_DIR, entry)
-            metadata = parse_script_metadata(script_path)
-            command = metadata.get("command", entry)
-            global_echo(f"  {command}")
-            found = True
-    global_echo("Community scripts:")
-    for entry in os.listdir(COMMUNITY_SCRIPTS_DIR):
-        if entry.endswith(".py"):
-            script_path = os.path.join(COMMUNITY_SCRIPTS_DIR, entry)
-            metadata = parse_script_metadata(script_path)
-            command = metadata.get("command", entry)
+    for title, namespace in [("Local scripts:", "local"), ("Community scripts:", "community")]:
+        global_echo(title)
+        for _, script_path, metadata in iter_scripts([namespace]):
+            command = (metadata or {}).get("command", os.path.basename(script_path))
             global_echo(f"  {command}")
             found = True
     if not found:
         global_echo("No scripts found.")
 
+@cli.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("-n", "--limit", default=20, show_default=True, help="Maximum number of results.")
+@click.option("--json", "as_json", is_flag=True, help="Print the results as JSON.")
+def search(query, limit, as_json):
+    """
+    Search the installed scripts.
+
+    QUERY is matched, fuzzily, against the commands, aliases, descriptions and
+    authors of local and community scripts. Results are ranked best first, with
+    name matches ahead of description matches.
+    """
+    results = search_scripts(" ".join(query), limit=limit)
+    if as_json:
+        import json
+
+        # Build the records from the search index alone, without touching the script index.
+        directories = dict(SCRIPT_DIRS)
+        scripts = [
+            dict(
+                script_info(namespace, os.path.join(directories[namespace], filename), {
+                    "command": command, "aliases": aliases,
+                    "description": description or None, "author": author or None,
+                }),
+                score=round(score, 4),
+            )
+            for score, (namespace, filename, command, aliases, description, author) in results
+        ]
+        click.echo(json.dumps(scripts, indent=2))
+        return
+    if not results:
+        global_echo("No matching scripts found.")
+        return
+    for _, (namespace, _, command, aliases, description, _) in results:
+        name = f"{namespace}:{command}"
+        line = f"{name:<28} {description}"
+        if aliases:
+            line += f" (aliases: {', '.join(aliases)})"
+        global_echo(line.rstrip())
+
 @cli.command(name="meta")
 @click.argument("script_identifier")
 def meta(script_identifier):
     """Display the metadata of a script."""
-    script_path = find_script(script_identifier)
-    if not script_path:
+    entry = find_script_entry(script_identifier)
+    if not entry:
         raise click.ClickException(f"Script '{script_identifier}' not found.")
-    metadata = parse_script_metadata(script_path)
+    metadata = entry[2]
     for key, value in metadata.items():
         global_echo(f"{key}: {value}")
 
 @cli.command()
-@click.argument("script_name")
-def install(script_name):
+@click.argument("commands", nargs=-1)
+@click.option("-j", "--jobs", default=WARM_JOBS, show_default=True, help="Number of environments to build concurrently.")
+@click.option("-f", "--force", is_flag=True, help="Rebuild environments even if their dependencies are unchanged.")
+def warm(commands, jobs, force):
     """
-    Install a script from the community repository.
+    Pre-build the uv environments of installed scripts.
 
-    The script is downloaded from the GitHub repository, stored in quarantine, and then,
-    after confirmation, moved to the community scripts directory.
+    COMMANDS are the scripts to warm (default: all installed scripts). Environments
+    are built concurrently, and scripts whose dependencies have not changed since
+    they were last warmed are skipped.
     """
-    clean_script_name = sanitize_script_name(script_name)
-    content = fetch_community_script(clean_script_name)
+    if commands:
+        entries = []
+        for command in commands:
+            entry = find_script_entry(command)
+            if not entry:
+                raise click.ClickException(f"Script '{command}' not found.")
+            entries.append((command, entry[1], entry[2]))
+    else:
+        entries = [
+            (f"{namespace}:{(metadata or {}).get('command', os.path.basename(script_path))}", script_path, metadata)
+            for namespace, script_path, metadata in iter_scripts()
+        ]
+    global_echo("Warming script environments:")
+    failed = warm_scripts(entries, jobs=jobs, force=force, log=global_echo)
+    if failed:
+        raise click.ClickException(f"Failed to warm {failed} script(s).")
 
-    if not content:
-        raise click.ClickException("Failed to download script.")
+@cli.command()
+@click.argument("script_names", nargs=-1, required=True)
+@click.option("--warm", "warm_env", is_flag=True, help="Build the scripts' environments in the background after installing.")
+def install(script_names, warm_env):
+    """
+    Install one or more scripts from the community repository.
 
-    quarantine_path = os.path.join(QUARANTINE_DIR, f"{clean_script_name}.py")
-    with open(quarantine_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    SCRIPT_NAMES can be commands, aliases or file names of community scripts; they are
+    resolved through the community manifest. The scripts are downloaded concurrently
+    from the GitHub repository and stored in quarantine. After a single confirmation,
+    they are moved to the community scripts directory and the shims are relinked once.
+    """
+    pool = ConnectionPool()
+    manifest = fetch_manifest(pool)
+    clean_script_names = list(dict.fromkeys(
+        sanitize_script_name(resolve_community_name(name, manifest)) for name in script_names
+    ))
+    hashes = {script["name"]: script.get("sha256") for script in manifest or []}
+    contents, errors = fetch_community_scripts(clean_script_names, pool=pool, hashes=hashes)
 
-    metadata = parse_script_metadata(quarantine_path)
+    # Validate every script before asking for confirmation.
+    scripts = []
+    for clean_script_name in clean_script_names:
+        if clean_script_name in errors:
+            continue
+        content = contents[clean_script_name]
+        if not content:
+            errors[clean_script_name] = f"Failed to download script '{clean_script_name}'."
+            continue
 
-    for field in ["command", "author"]:
-        if field not in metadata:
-            raise click.ClickException(f"Script is missing required field '{field}'")
+        quarantine_path = os.path.join(QUARANTINE_DIR, f"{clean_script_name}.py")
+        with open(quarantine_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+        try:
+            metadata = parse_script_metadata(quarantine_path)
+        except ValueError as e:
+            errors[clean_script_name] = f"Script '{clean_script_name}' has an invalid header: {e}"
+            continue
+        missing = [field for field in ["command", "author"] if field not in metadata]
+        if missing:
+            errors[clean_script_name] = f"Script '{clean_script_name}' is missing required field '{missing[0]}'"
+            continue
+        scripts.append((clean_script_name, quarantine_path, metadata))
+
+    if errors:
+        for clean_script_name, _, _ in scripts:
+            os.remove(os.path.join(QUARANTINE_DIR, f"{clean_script_name}.py"))
+        raise click.ClickException("\n".join(errors[name] for name in clean_script_names if name in errors))
+
+    if len(scripts) == 1:
+        clean_script_name, _, metadata = scripts[0]
+        prompt = (
+            f"'{clean_script_name}' is a community script by {metadata['author']}.\n"
+            "It may access the internet, read and write files, and use third party libraries.\n"
+            "Are you sure you want to install this script?"
+        )
+    else:
+        listing = "\n".join(f"  {name} (by {metadata['author']})" for name, _, metadata in scripts)
+        prompt = (
+            f"The following community scripts will be installed:\n{listing}\n"
+            "They may access the internet, read and write files, and use third party libraries.\n"
+            "Are you sure you want to install these scripts?"
+        )
 
-    prompt = (
-        f"'{clean_script_name}' is a community script by {metadata['author']}.\n"
-        "It may access the internet, read and write files, and use third party libraries.\n"
-        "Are you sure you want to install this script?"
-    )
-    
     if not click.confirm(prompt):
+        for _, quarantine_path, _ in scripts:
+            os.remove(quarantine_path)
         click.secho("Installation aborted.", fg="red")
         return
 
-    # Check for name collisions in the community namespace
-    new_script_path = os.path.join(COMMUNITY_SCRIPTS_DIR, f"{clean_script_name}.py")
+    for clean_script_name, quarantine_path, _ in scripts:
+        # Move the script from quarantine to the community directory
+        new_script_path = os.path.join(COMMUNITY_SCRIPTS_DIR, f"{clean_script_name}.py")
+        os.replace(quarantine_path, new_script_path)
+        global_echo(f"Succesfully installed '{clean_script_name}'.")
+        global_echo(f"You can now run the script with '$ act run {clean_script_name}' or '$ {clean_script_name}'")
+
+    # Update the shims once after installing all scripts (without reloading the shell)
+    update_shims(reload_shell=False)
+
+    if warm_env:
+        warm_in_background([f"community:{metadata['command']}" for _, _, metadata in scripts])
+        global_echo("Building the script environments in the background.")
+
+@cli.command()
+@click.option("-n", "--dry-run", is_flag=True, help="Only report which scripts would be updated.")
+@click.option("-y", "--yes", is_flag=True, help="Update without asking for confirmation.")
+def update(dry_run, yes):
+    """
+    Update installed community scripts.
+
+    Local copies are compared by content hash against the community manifest and only
+    changed scripts are downloaded, concurrently. The new versions are staged in
+    quarantine, swapped in together and the shims are relinked once.
+    """
+    pool = ConnectionPool()
+    manifest = fetch_manifest(pool, max_age=0)
+    if manifest is None:
+        raise click.ClickException("Failed to fetch the community script manifest.")
+    scripts = {script["name"]: script for script in manifest}
+
+    changed = []
+    for _, script_path, _ in iter_scripts(["community"]):
+        name = os.path.splitext(os.path.basename(script_path))[0]
+        script = scripts.get(name)
+        if script is None:
+            global_echo(f"'{name}' is no longer in the community repository; skipping.")
+        elif file_sha256(script_path) != script.get("sha256"):
+            changed.append(name)
+
+    if not changed:
+        global_echo("All community scripts are up to date.")
+        return
+
+    total_bytes = sum(scripts[name].get("size") or 0 for name in changed)
+    global_echo(f"{len(changed)} script(s) to update ({total_bytes} bytes to download):")
+    for name in changed:
+        global_echo(f"  {name} ({scripts[name].get('size')} bytes)")
+    if dry_run:
+        return
+    if not yes and not click.confirm("Community scripts may access the internet, read and write files, and use third party libraries.\nUpdate these scripts?"):
+        click.secho("Update aborted.", fg="red")
+        return
+
+    contents, errors = fetch_community_scripts(
+        changed, pool=pool, hashes={name: scripts[name].get("sha256") for name in changed}
+    )
+
+    # Stage every script in quarantine and validate it before swapping any in.
+    staged = []
+    for name in changed:
+        if name in errors:
+            continue
+        quarantine_path = os.path.join(QUARANTINE_DIR, f"{name}.py")
+        with open(quarantine_path, "w", encoding="utf-8") as f:
+            f.write(contents[name])
+        staged.append((quarantine_path, os.path.join(COMMUNITY_SCRIPTS_DIR, f"{name}.py")))
+        try:
+            metadata = parse_script_metadata(quarantine_path)
+        except ValueError as e:
+            errors[name] = f"Script '{name}' has an invalid header: {e}"
+            continue
+        for field in ["command", "author"]:
+            if field not in metadata:
+                errors[name] = f"Script '{name}' is missing required field '{field}'"
 
-    # Move the script from quarantine to the community directory
-    os.rename(quarantine_path, new_script_path)
-    global_echo(f"Succesfully installed '{clean_script_name}'.")
-    global_echo(f"You can now run the script with '$ act run {clean_script_name}' or '$ {clean_script_name}'")
+    if errors:
+        for quarantine_path, _ in staged:
+            os.remove(quarantine_path)
+        raise click.ClickException("\n".join(errors[name] for name in changed if name in errors))
 
-    # Update the shims after installing a new script (without reloading the shell)
+    swap_in_scripts(staged)
+    global_echo(f"Successfully updated {len(staged)} script(s).")
     update_shims(reload_shell=False)
 
+@cli.command()
+@click.argument("script_identifier", required=False)
+def stats(script_identifier):
+    """
+    Show run statistics per command.
+
+    Lists the number of runs, failure rate and p50/p95/p99 latency of every command
+    run through act (or only SCRIPT_IDENTIFIER), and flags commands that got slower
+    after their script was updated.
+    """
+    runs = read_history()
+    if script_identifier:
+        entry = find_script_entry(script_identifier)
+        command = (entry[2] or {}).get("command") if entry else script_identifier
+        runs = [run for run in runs if run["command"] == command]
+    if not runs:
+        global_echo("No runs recorded yet.")
+        return
+
+    by_command = {}
+    for run in runs:
+        by_command.setdefault(run["command"], []).append(run)
+
+    global_echo(f"{'Command':<20} {'runs':>6} {'failed':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for command, command_runs in sorted(by_command.items()):
+        summary = run_stats(command_runs)
+        line = (
+            f"{command:<20} {summary['runs']:>6} {summary['failure_rate']:>7.0%} "
+            f"{summary['p50']:>8.2f}s {summary['p95']:>8.2f}s {summary['p99']:>8.2f}s"
+        )
+        if summary["regression"]:
+            line += f"  {summary['regression']:.1f}x slower since last update"
+        global_echo(line)
+
+@cli.command()
+@click.argument("shell", type=click.Choice(sorted(COMPLETION_SCRIPTS)))
+def completion(shell):
+    """
+    Print the tab completion script for SHELL.
+
+    The script completes subcommands and script names from a cache in
+    ~/.act/completion that act keeps up to date, without starting Python.
+
+    \b
+    bash: add  eval "$(act completion bash)"  to ~/.bashrc
+    zsh:  add  eval "$(act completion zsh)"   to ~/.zshrc (after compinit)
+    fish: run  act completion fish > ~/.config/fish/completions/act.fish
+    """
+    import shlex
+
+    write_completion_cache("scripts", refresh_index()["lookup"])
+    write_completion_cache("subcommands", cli.commands)
+    click.echo(COMPLETION_SCRIPTS[shell].replace("@CACHE@", shlex.quote(COMPLETION_DIR)), nl=False)
+
+@cli.command(name="map")
+@click.argument("script_identifier")
+@click.argument("inputs", nargs=-1)
+@click.option("-j", "--jobs", default=MAP_JOBS, show_default=True, help="Number of runs at a time.")
+@click.option("-g", "--group", is_flag=True, help="Print each run's output in one block instead of prefixing its lines.")
+def map_inputs(script_identifier, inputs, jobs, group):
+    """
+    Run a script once for each of many inputs.
+
+    SCRIPT_IDENTIFIER is the command name (optionally namespaced) or one of its aliases.
+    Each of INPUTS is passed to the script as its only argument. Without INPUTS,
+    they are read from stdin, one per line. Use '--' before inputs that start with '-'.
+
+    The script's environment is resolved once, and the runs are spread over a pool
+    of --jobs processes. The exit code is the number of failed runs (at most 100).
+    """
+    entry = find_script_entry(script_identifier)
+    if not entry:
+        raise click.ClickException(f"Script '{script_identifier}' not found.")
+    if not inputs:
+        if sys.stdin.isatty():
+            raise click.ClickException("No inputs given: pass them as arguments or on stdin.")
+        inputs = [line.strip() for line in sys.stdin if line.strip()]
+    start_time = time.time()
+    try:
+        results = map_script(entry, inputs, jobs=jobs, group=group)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    elapsed = time.time() - start_time
+
+    failed = [result for result in results if result[1] != 0]
+    global_echo("Summary:")
+    for value, returncode, run_elapsed in results:
+        status = "ok" if returncode == 0 else f"failed with exit code {returncode}"
+        global_echo(f"  {value}: {status} ({run_elapsed:.2f}s)")
+    message = (
+        f"Ran {len(results)} input(s) in {elapsed:.2f}s ({len(results) / max(elapsed, 1e-9):.2f}/s): "
+        f"{len(results) - len(failed)} succeeded, {len(failed)} failed."
+    )
+    global_echo(message)
+    sys.exit(min(len(failed), 100))
+
+@cli.command(context_settings={"ignore_unknown_options": True, "allow_interspersed_args": False})
+@click.argument("argv", nargs=-1, type=click.UNPROCESSED, required=True)
+def pipe(argv):
+    """
+    Run scripts as a pipeline: act pipe a [args] ! b [args] ! c.
+
+    Stages are separated by '!' (quote it in shells that expand it). Each stage's
+    stdout is connected to the next stage's stdin, all stages are resolved before
+    any of them starts, and they run concurrently. Like a shell with pipefail, the
+    exit code is that of the last stage that failed. The runtime of each stage and
+    the bytes it passed on are reported on stderr.
+    """
+    groups = [[]]
+    for arg in argv:
+        if arg == "!":
+            groups.append([])
+        else:
+            groups[-1].append(arg)
+    stages = []
+    for group in groups:
+        if not group:
+            raise click.ClickException("Empty pipeline stage.")
+        entry = find_script_entry(group[0])
+        if not entry:
+            raise click.ClickException(f"Script '{group[0]}' not found.")
+        stages.append((entry, group[1:]))
+
+    start_time = time.time()
+    results = run_pipeline(stages)
+    elapsed = time.time() - start_time
+    returncode = next((code for code, _, _ in reversed(results) if code != 0), 0)
+    global_echo(f"Pipeline finished in {elapsed:.2f}s:", err=True)
+    for index, (group, (code, stage_elapsed, written)) in enumerate(zip(groups, results), start=1):
+        line = f"  {index}. {' '.join(group)}: exit code {code}, {stage_elapsed:.2f}s"
+        if written is not None:
+            line += f", {written} bytes out"
+        global_echo(line, err=True)
+    sys.exit(returncode)
+
+@cli.command()
+@click.option("--detach", is_flag=True, help="Run the daemon in the background.")
+@click.option("--stop", is_flag=True, help="Stop a running daemon.")
+def serve(detach, stop):
+    """
+    Run the launcher daemon for near-instant script starts.
+
+    While it runs, 'act run' and the shims hand scripts to the daemon, which keeps
+    an interpreter per dependency set with the scripts' modules already imported
+    and forks a worker per run. Without the daemon, scripts are run as usual.
+    """
+    import socket
+
+    if not hasattr(os, "fork") or not hasattr(socket, "send_fds"):
+        raise click.ClickException("act serve is not supported on this platform.")
+    if stop:
+        if not stop_server():
+            raise click.ClickException("act serve is not running.")
+        global_echo("Stopped act serve.")
+        return
+    if detach:
+        import subprocess
+
+        subprocess.Popen(
+            [sys.executable, path_to_self(), "serve"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        global_echo(f"Started act serve in the background on {SERVE_SOCKET}.")
+        return
+    try:
+        serve_forever(log=global_echo)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    except KeyboardInterrupt:
+        pass
+
+@cli.command()
+@click.option("-n", "--repeat", default=10, show_default=True, help="Number of measured runs per case.")
+@click.option("--scripts", "size", default=100, show_default=True, help="Number of synthetic scripts to install.")
+@click.option("--json", "as_json", is_flag=True, help="Print the results as JSON.")
+def bench(repeat, size, as_json):
+    """
+    Benchmark the launch latency act adds on top of running a script.
+
+    Runs a helloworld script directly with python, with 'uv run', with
+    'act run' and through its shim, in a temporary act home containing a
+    synthetic set of scripts, and reports min/median/p95 wall-clock and CPU time.
+    """
+    if not hasattr(os, "wait4"):
+        raise click.ClickException("act bench is not supported on this platform.")
+    log = (lambda message: None) if as_json else global_echo
+    try:
+        report = run_benchmarks(repeat, size, log=log)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    if as_json:
+        import json
+        click.echo(json.dumps(report, indent=2))
+        return
+    global_echo(f"{'Case':<10} {'min':>9} {'median':>9} {'p95':>9} {'cpu':>9}")
+    for name, result in report["results"].items():
+        wall, cpu = result["wall"], result["cpu"]
+        global_echo(
+            f"{name:<10} {wall['min'] * 1000:>7.1f}ms {wall['median'] * 1000:>7.1f}ms "
+            f"{wall['p95'] * 1000:>7.1f}ms {cpu['median'] * 1000:>7.1f}ms"
+        )
+
 if __name__ == "__main__":
     cli()
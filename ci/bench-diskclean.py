@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = []
+# ///
+
+"""
+Benchmark of diskclean's scanner on generated trees, cold and with the cache of a
+previous scan, against the previous implementation, which blocked pool workers
+on their subdirectories' futures and collected every file before sorting.
+
+The legacy scanner only runs on a tree shallow enough that fewer than 16 of its
+tasks wait on subdirectories at once: on anything deeper, every worker ends up
+waiting on a subdirectory that can never be scheduled, and it hangs.
+
+Run with: uv run ci/bench-diskclean.py
+"""
+
+import os
+import time
+import tempfile
+import tracemalloc
+import importlib.util
+import concurrent.futures
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+spec = importlib.util.spec_from_file_location("diskclean", os.path.join(ROOT_DIR, "community-scripts", "diskclean.py"))
+diskclean = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(diskclean)
+
+
+def legacy_scan_directory(path, executor):
+    """The scanner as it was before the work queue rewrite."""
+    total = 0
+    items = []
+    futures = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_file(follow_symlinks=False):
+                        size = entry.stat(follow_symlinks=False).st_size
+                        total += size
+                        items.append((entry.path, size, "file"))
+                    elif entry.is_dir(follow_symlinks=False):
+                        futures.append(executor.submit(legacy_scan_directory, entry.path, executor))
+                except Exception:
+                    continue
+    except Exception:
+        return 0, []
+    for future in futures:
+        try:
+            sub_total, sub_items = future.result()
+            total += sub_total
+            items.extend(sub_items)
+        except Exception:
+            continue
+    items.append((path, total, "dir"))
+    return total, items
+
+
+def legacy_scan(root):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        total, items = legacy_scan_directory(root, executor)
+    return total, sorted(items, key=lambda x: x[1], reverse=True)[:20]
+
+
+def current_scan(root):
+    return diskclean.scan(root)
+
+
+def make_file(path, size):
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+
+def generate_wide_tree(root, fanout, depth, files_per_dir):
+    """A balanced tree: fanout subdirectories per level, files in every directory."""
+    count = 0
+    level = [root]
+    for d in range(depth + 1):
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                make_file(os.path.join(directory, f"f{i}.bin"), (count * 7919) % 100_000)
+                count += 1
+            if d < depth:
+                for i in range(fanout):
+                    sub = os.path.join(directory, f"d{i}")
+                    os.mkdir(sub)
+                    next_level.append(sub)
+        level = next_level
+    return count
+
+
+def generate_deep_tree(root, chains, depth, files_per_dir):
+    """chains nested directory chains of the given depth, with files at every level."""
+    count = 0
+    for c in range(chains):
+        directory = root
+        for d in range(depth):
+            directory = os.path.join(directory, f"c{c}" if d == 0 else "d")
+            os.mkdir(directory)
+            for i in range(files_per_dir):
+                make_file(os.path.join(directory, f"f{i}.bin"), (count * 7919) % 100_000)
+                count += 1
+    return count
+
+
+def bench(label, func, root, files):
+    start = time.perf_counter()
+    total, *_ = func(root)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(root)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<8} {elapsed:>8.3f}s {files / elapsed:>12.0f} files/s {peak / 1024:>10.0f} KB peak")
+    return total
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        wide = os.path.join(tmp, "wide")
+        os.mkdir(wide)
+        files = generate_wide_tree(wide, fanout=12, depth=2, files_per_dir=150)
+        print(f"wide tree (depth 2, {files} files):")
+        assert bench("legacy", legacy_scan, wide, files) == bench("current", current_scan, wide, files)
+
+        for chains in (4, 16):
+            deep = os.path.join(tmp, f"deep{chains}")
+            os.mkdir(deep)
+            files = generate_deep_tree(deep, chains=chains, depth=200, files_per_dir=10)
+            print(f"deep tree ({chains} chains of depth 200, {files} files):")
+            bench("current", current_scan, deep, files)
+            records = diskclean.scan(deep, record=True)[3]
+            bench("cached", lambda root: diskclean.scan(root, cache=records), deep, files)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = ["click"]
+# ///
+
+"""
+Micro-benchmark of act's header parser against the previous implementation,
+which read the whole file and parsed the header with the AST.
+
+Run with: uv run ci/bench-parse-header.py
+"""
+
+import os
+import sys
+import ast
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+import act  # noqa: E402
+
+HEADER = '''#!/usr/bin/env python3
+# /// script
+# command = "bench"
+# description = "A synthetic script for benchmarking the header parser"
+# aliases = ["bench-header", "bh"]
+# author = "janoelze"
+# dependencies = ["requests<3", "rich"]
+# ///
+'''
+
+
+def legacy_parse_header(file_content):
+    """The header parser as it was before the streaming reader."""
+    header_started = False
+    header_lines = []
+    for line in file_content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("# ///"):
+            if not header_started:
+                header_started = True
+                continue
+            break
+        if header_started and stripped.startswith("#"):
+            header_lines.append(stripped[1:].strip())
+
+    tree = ast.parse("\n".join(header_lines), mode="exec")
+    header_dict = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            header_dict[node.targets[0].id] = ast.literal_eval(node.value)
+    return header_dict
+
+
+def legacy_parse_script_metadata(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return legacy_parse_header(f.read())
+
+
+def write_script(directory, name, body_bytes):
+    path = os.path.join(directory, f"{name}.py")
+    line = "DATA = 'x' * 64  # padding to simulate vendored code or data blobs\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.write(line * (body_bytes // len(line)))
+    return path
+
+
+def bench(label, func, path, number):
+    assert func(path)["command"] == "bench"
+    seconds = min(timeit.repeat(lambda: func(path), number=number, repeat=5)) / number
+    print(f"  {label:<8} {seconds * 1e6:>12.1f} us/parse")
+    return seconds
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [("small", 2 * 1024, 2000), ("1MB", 1024 * 1024, 50), ("8MB", 8 * 1024 * 1024, 5)]
+        for name, size, number in cases:
+            path = write_script(tmp, name, size)
+            print(f"{name} script ({os.path.getsize(path)} bytes):")
+            before = bench("legacy", legacy_parse_script_metadata, path, number)
+            after = bench("current", act.parse_script_metadata, path, number)
+            print(f"  speedup  {before / after:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
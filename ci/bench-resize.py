@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = ["Pillow"]
+# ///
+
+"""
+Benchmark of resize producing several widths from a generated image corpus,
+against the previous implementation, which decoded every image at full size for
+each width (one run per width) and resized it with a single LANCZOS pass.
+
+Each variant runs in its own process, so the peak RSS it reports is its own.
+
+Run with: uv run ci/bench-resize.py
+"""
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+import importlib.util
+
+from PIL import Image
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+WIDTHS = [320, 640, 1280]
+
+
+def load_resize():
+    spec = importlib.util.spec_from_file_location("resize", os.path.join(ROOT_DIR, "community-scripts", "resize.py"))
+    resize = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(resize)
+    return resize
+
+
+def legacy_resize_image(path, width):
+    """resize_image as it was before multi-width support."""
+    img = Image.open(path)
+    wpercent = (width / float(img.size[0]))
+    hsize = int((float(img.size[1]) * float(wpercent)))
+    img = img.resize((width, hsize), Image.Resampling.LANCZOS)
+    new_path = f"{os.path.splitext(path)[0]}-w{width}{os.path.splitext(path)[1]}"
+    img.save(new_path)
+    return new_path
+
+
+def generate_corpus(directory, count, size, extension):
+    """Write count images of the given size and format."""
+    paths = []
+    for i in range(count):
+        img = Image.effect_mandelbrot(size, (-2 + i * 0.01, -1, 1, 1), 60 + i).convert("RGB")
+        path = os.path.join(directory, f"image{i}.{extension}")
+        img.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def run_variant(variant, paths):
+    start = time.perf_counter()
+    if variant == "legacy":
+        for width in WIDTHS:
+            for path in paths:
+                legacy_resize_image(path, width)
+    else:
+        resize = load_resize()
+        for path in paths:
+            resize.resize_image(path, WIDTHS)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {peak_rss()}")
+
+
+def peak_rss():
+    """Return this process's peak RSS in bytes."""
+    # On Linux, ru_maxrss survives execve and would include the parent's peak.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    if len(sys.argv) > 2:
+        run_variant(sys.argv[1], sys.argv[2:])
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        for count, size, extension in [(12, (4000, 3000), "jpg"), (24, (1600, 1200), "jpg"), (8, (3000, 2000), "png")]:
+            paths = generate_corpus(tmp, count, size, extension)
+            print(f"{count} {extension} images of {size[0]}x{size[1]}, widths {','.join(map(str, WIDTHS))}:")
+            for variant in ("legacy", "current"):
+                output = subprocess.run(
+                    [sys.executable, __file__, variant] + paths, capture_output=True, text=True, check=True,
+                ).stdout
+                elapsed, max_rss = output.split()
+                elapsed = float(elapsed)
+                print(
+                    f"  {variant:<8} {elapsed:>8.2f}s {len(paths) / elapsed:>8.1f} images/s"
+                    f" {int(max_rss) / (1024 * 1024):>8.1f} MB peak RSS"
+                )
+            for name in os.listdir(tmp):
+                os.remove(os.path.join(tmp, name))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 import json
 import re
+import hashlib
 
 
 def extract_header_info(file_path):
@@ -26,6 +27,13 @@ def extract_header_info(file_path):
     return header_info
 
 
+def file_digest(file_path):
+    """Return the SHA-256 hex digest and size in bytes of a file."""
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return hashlib.sha256(content).hexdigest(), len(content)
+
+
 def create_index(directory):
     """Create an index of scripts with metadata from the headers."""
     index = {"scripts": []}
@@ -36,17 +44,28 @@ def create_index(directory):
             header_info = extract_header_info(file_path)
 
             if header_info['command']:
+                sha256, size = file_digest(file_path)
                 index['scripts'].append({
                     "file": file_path,
                     "command": header_info['command'],
                     "description": header_info['description'],
                     "author": header_info['author'],
-                    "aliases": header_info['aliases']
+                    "aliases": header_info['aliases'],
+                    "sha256": sha256,
+                    "size": size
                 })
 
     # Sort scripts alphabetically by command (case-insensitive)
     index['scripts'] = sorted(index['scripts'], key=lambda script: script['command'].lower())
 
+    # Publish the index next to the scripts as a machine-readable manifest for act
+    index_path = os.path.join(directory, 'index')
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=4)
+        f.write("\n")
+
+    print(f"Updated manifest at {index_path}")
+
     # Update the README file
     self_dir = os.path.dirname(os.path.realpath(__file__))
     readme_path = os.path.join(self_dir, '..', 'README.md')
@@ -9,8 +9,26 @@
 
 import os
 import sys
+import heapq
+import queue
+import pickle
+import hashlib
+import argparse
+import threading
 import concurrent.futures
 
+# Number of threads scanning directories concurrently
+WORKERS = 16
+# Number of files and directories to list
+TOP_N = 20
+# Directory of the per-root scan caches
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".act", "cache", "diskclean")
+CACHE_VERSION = 1
+# Bytes hashed at each end of a file to rule out most same-size files cheaply
+PARTIAL_BLOCK = 64 * 1024
+# Buffer size for full-file hashing
+READ_CHUNK = 1024 * 1024
+
 def human_readable_size(size, decimal_places=1):
     """Convert a size in bytes into a human-readable string."""
     for unit in ["B", "KB", "MB", "GB", "TB"]:
@@ -19,70 +37,323 @@ def human_readable_size(size, decimal_places=1):
         size /= 1024
     return f"{size:.{decimal_places}f}PB"
 
-def scan_directory(path, executor):
+def push_top(heap, item, limit):
+    """Add a (size, path) item to a min-heap holding the limit largest items."""
+    if len(heap) < limit:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+def scan(root, workers=WORKERS, top=TOP_N, cache=None, files_by_size=None, record=False):
     """
-    Recursively scan a directory and return a tuple:
-      (total_size, list_of_items)
-    where list_of_items is a list of tuples (path, size, type)
-    with type being "file" or "dir".
+    Scan the tree under root.
+
+    Returns (total_size, top_files, top_dirs, records, scanned, skipped). top_files
+    and top_dirs are lists of (size, path), largest first, and scanned is the number
+    of directories visited. With record set, records maps every scanned directory to
+    (inode, mtime, size of its files, names of its subdirectories, its largest files
+    as (size, name)), and can be passed back as cache on the next run: directories
+    whose inode and mtime are unchanged are then not listed again, only their
+    subdirectories are stat'ed. skipped counts those directories. Without record,
+    records is None and nothing is kept per directory.
+
+    If files_by_size is a dict, every file is added to it as (path, device, inode)
+    under its size. The cache is not used then, as it doesn't list every file.
+
+    Directories are scanned by worker threads pulling from a shared queue; no worker
+    ever waits on another, so the depth of the tree doesn't matter. Each directory
+    that is being scanned or has subdirectories still being scanned has a node
+    holding its parent, its size so far and the number of pending scans below it.
+    Once that number drops to zero the directory's size is final and is added to
+    its parent, so only the frontier of the scan is kept in memory, plus heaps of
+    the top entries.
     """
-    total = 0
-    items = []
-    futures = []
-    
-    try:
-        with os.scandir(path) as it:
-            for entry in it:
-                try:
-                    # Skip symbolic links to avoid recursion loops
-                    if entry.is_symlink():
-                        continue
+    cache = cache if cache and files_by_size is None else {}
+    records = {} if record else None
+    nodes = {root: [None, 0, 1]}
+    lock = threading.Lock()
+    work = queue.Queue()
+    heaps = []
+    result = [0, 0, 0]
 
-                    if entry.is_file(follow_symlinks=False):
-                        size = entry.stat(follow_symlinks=False).st_size
-                        total += size
-                        items.append((entry.path, size, "file"))
-                    elif entry.is_dir(follow_symlinks=False):
-                        # Schedule a recursive scan for the subdirectory.
-                        futures.append(executor.submit(scan_directory, entry.path, executor))
-                except Exception:
-                    # Ignore any entry that cannot be accessed
-                    continue
-    except Exception:
-        return 0, []
+    def finish(path, top_dirs):
+        # Called with the lock held once the scans of path and its subdirectories are done.
+        while True:
+            parent, size, _ = nodes.pop(path)
+            push_top(top_dirs, (size, path), top)
+            if parent is None:
+                result[0] = size
+                return
+            node = nodes[parent]
+            node[1] += size
+            node[2] -= 1
+            if node[2]:
+                return
+            path = parent
 
-    # Process all the subdirectories concurrently.
-    for future in futures:
+    def list_directory(path, all_files):
+        # Return the size of the files in path, its subdirectories and its largest files,
+        # adding every file to all_files if it isn't None.
+        size = 0
+        subdirs = []
+        top_files = []
         try:
-            sub_total, sub_items = future.result()
-            total += sub_total
-            items.extend(sub_items)
-        except Exception:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        # Skip symbolic links to avoid recursion loops
+                        if entry.is_symlink():
+                            continue
+                        if entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            size += st.st_size
+                            push_top(top_files, (st.st_size, entry.name), top)
+                            if all_files is not None:
+                                all_files.append((st.st_size, entry.path, st.st_dev, st.st_ino))
+                        elif entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                    except OSError:
+                        # Ignore any entry that cannot be accessed
+                        continue
+        except OSError:
+            pass
+        return size, tuple(subdirs), tuple(top_files)
+
+    def worker():
+        top_files, top_dirs = [], []
+        heaps.append((top_files, top_dirs))
+        scanned = skipped = 0
+        while True:
+            path = work.get()
+            if path is None:
+                with lock:
+                    result[1] += scanned
+                    result[2] += skipped
+                return
+            scanned += 1
+            try:
+                st = os.stat(path, follow_symlinks=False)
+                key = (st.st_ino, st.st_mtime_ns)
+            except OSError:
+                key = None
+            cached = cache.get(path)
+            all_files = [] if files_by_size is not None else None
+            if key and cached and cached[:2] == key:
+                size, subdirs, files = cached[2:]
+                skipped += 1
+            else:
+                size, subdirs, files = list_directory(path, all_files)
+            if key and record:
+                records[path] = key + (size, subdirs, files)
+            for file_size, name in files:
+                push_top(top_files, (file_size, os.path.join(path, name)), top)
+            subdirs = [os.path.join(path, name) for name in subdirs]
+            with lock:
+                node = nodes[path]
+                node[1] += size
+                node[2] += len(subdirs) - 1
+                for subdir in subdirs:
+                    nodes[subdir] = [path, 0, 1]
+                for file_size, file_path, device, inode in all_files or ():
+                    files_by_size.setdefault(file_size, []).append((file_path, device, inode))
+                if not node[2]:
+                    finish(path, top_dirs)
+            for subdir in subdirs:
+                work.put(subdir)
+            work.task_done()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    work.put(root)
+    work.join()
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+
+    top_files = heapq.nlargest(top, (item for files, _ in heaps for item in files))
+    top_dirs = heapq.nlargest(top, (item for _, dirs in heaps for item in dirs))
+    return result[0], top_files, top_dirs, records, result[1], result[2]
+
+def hash_range(path, start, end):
+    """Return the BLAKE2 digest of bytes start to end of a file, read in READ_CHUNK chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(min(READ_CHUNK, max(end - start, 1)))
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            read = f.readinto(view[:min(remaining, len(buffer))])
+            if not read:
+                break
+            digest.update(view[:read])
+            remaining -= read
+    return digest.digest()
+
+def partial_hash(path, size):
+    """Hash the first and last PARTIAL_BLOCK bytes of a file (all of it, if it is small)."""
+    if size <= 2 * PARTIAL_BLOCK:
+        return hash_range(path, 0, size)
+    return hash_range(path, 0, PARTIAL_BLOCK) + hash_range(path, size - PARTIAL_BLOCK, size)
+
+def middle_hash(path, size):
+    """Hash the part of a file partial_hash didn't read."""
+    return hash_range(path, PARTIAL_BLOCK, size - PARTIAL_BLOCK)
+
+def find_duplicates(files_by_size, workers=WORKERS):
+    """
+    Find sets of files with identical contents.
+
+    files_by_size maps sizes to lists of (path, device, inode), as collected by scan.
+    Candidates are narrowed down in stages, so that only files that still might have
+    a duplicate are read further:
+
+    - size: only sizes shared by at least two files (hard links to the same inode
+      count once) are considered
+    - partial hash: the first and last PARTIAL_BLOCK bytes; this reads files up to
+      twice that size entirely, which settles them
+    - full hash: the remaining middle part of larger files
+
+    Hashing is spread over a thread pool. Returns (groups, bytes_read), where groups
+    is a list of (size, paths) with at least two paths each.
+    """
+    candidates = []
+    for size, entries in files_by_size.items():
+        if size == 0 or len(entries) < 2:
             continue
+        inodes = {}
+        for path, device, inode in entries:
+            inodes.setdefault((device, inode), path)
+        if len(inodes) > 1:
+            candidates.extend((size, path) for path in inodes.values())
+
+    def run_stage(items, func):
+        # Hash (key, size, path) items and group the paths by (key, hash), skipping unreadable files.
+        def task(item):
+            key, size, path = item
+            try:
+                return key + (func(path, size),), path
+            except OSError:
+                return None
+        groups = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for result in executor.map(task, items):
+                if result:
+                    groups.setdefault(result[0], []).append(result[1])
+        return [(key, paths) for key, paths in groups.items() if len(paths) > 1]
+
+    bytes_read = sum(min(size, 2 * PARTIAL_BLOCK) for size, _ in candidates)
+    groups = []
+    remaining = []
+    for key, paths in run_stage([((size,), size, path) for size, path in candidates], partial_hash):
+        size = key[0]
+        if size <= 2 * PARTIAL_BLOCK:
+            groups.append((size, paths))
+        else:
+            remaining.extend((key, size, path) for path in paths)
+    bytes_read += sum(size - 2 * PARTIAL_BLOCK for _, size, _ in remaining)
+    for key, paths in run_stage(remaining, middle_hash):
+        groups.append((key[0], paths))
+    return groups, bytes_read
+
+def report_duplicates(groups, bytes_read, top):
+    """Print the duplicate sets that waste the most space."""
+    groups = sorted(((size * (len(paths) - 1), size, sorted(paths)) for size, paths in groups), reverse=True)
+    reclaimable = sum(wasted for wasted, _, _ in groups)
+    print(f"{len(groups)} sets of duplicates, {human_readable_size(reclaimable)} reclaimable:")
+    for wasted, size, paths in groups[:top]:
+        print(f"{human_readable_size(wasted):>10}  {len(paths)} copies of {human_readable_size(size)}")
+        for path in paths:
+            print(f"{'':>10}  {path}")
+    if len(groups) > top:
+        print(f"... and {len(groups) - top} more sets")
+    print(f"Read {human_readable_size(bytes_read)} to compare the candidates.", file=sys.stderr)
 
-    # Record the size of the directory itself.
-    items.append((path, total, "dir"))
-    return total, items
+def cache_path(root):
+    """Return the path of the scan cache of root."""
+    digest = hashlib.sha256(root.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{digest}.pickle")
+
+def load_cache(root, top):
+    """
+    Load the directory records of the last scan of root.
+
+    Records hold each directory's largest files, so a cache written with a smaller
+    top than requested can't be used.
+    """
+    try:
+        with open(cache_path(root), "rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("root") != root or cache.get("top", 0) < top:
+        return {}
+    return cache["dirs"]
+
+def save_cache(root, top, records):
+    """Atomically write the directory records of a scan of root."""
+    path = cache_path(root)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": CACHE_VERSION, "root": root, "top": top, "dirs": records}, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
 
 def main():
-    home_dir = os.path.expanduser("~")
-    
-    # Use a ThreadPoolExecutor to scan directories concurrently.
-    # Adjust max_workers as needed (defaulting here to 16).
-    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
-        total_size, all_items = scan_directory(home_dir, executor)
-    
-    # Sort items by size in descending order.
-    sorted_items = sorted(all_items, key=lambda x: x[1], reverse=True)
-    
+    parser = argparse.ArgumentParser(description="List the largest files and directories under a directory.")
+    parser.add_argument("--root", default=os.path.expanduser("~"), help="Directory to scan (default: your home directory)")
+    parser.add_argument("--top", type=int, default=TOP_N, help=f"Number of entries to list (default: {TOP_N})")
+    parser.add_argument("--no-cache", action="store_true", help=(
+        "Rescan every directory and don't update the cache. The cache reuses directories whose "
+        "mtime is unchanged, which misses files that grew in place; use this for exact sizes"
+    ))
+    parser.add_argument("--duplicates", action="store_true", help="List sets of files with identical contents instead")
+    args = parser.parse_args()
+
+    if args.top <= 0:
+        print("Error: Invalid --top")
+        sys.exit(1)
+    root = os.path.realpath(args.root)
+    if not os.path.isdir(root):
+        print(f"Error: {args.root} is not a directory")
+        sys.exit(1)
+
+    if args.duplicates:
+        files_by_size = {}
+        scan(root, top=args.top, files_by_size=files_by_size)
+        groups, bytes_read = find_duplicates(files_by_size)
+        report_duplicates(groups, bytes_read, args.top)
+        return
+
+    cache = {} if args.no_cache else load_cache(root, args.top)
+    total_size, top_files, top_dirs, records, scanned, skipped = scan(
+        root, top=args.top, cache=cache, record=not args.no_cache,
+    )
+    if not args.no_cache:
+        try:
+            save_cache(root, args.top, records)
+        except OSError as e:
+            print(f"Warning: could not write the scan cache: {e}", file=sys.stderr)
+
+    items = sorted(
+        [(size, path, "file") for size, path in top_files] + [(size, path, "dir") for size, path in top_dirs],
+        reverse=True,
+    )
+
     # Print header.
     print(f"{'Size':>10} {'Type':>4}  Path")
     print("-" * 80)
-    
-    # Print the top 20 largest items.
-    for item in sorted_items[:20]:
-        path, size, typ = item
+
+    # Print the largest items.
+    for size, path, typ in items[:args.top]:
         print(f"{human_readable_size(size):>10} {typ:>4}  {path}")
+    print(f"Total: {human_readable_size(total_size)} in {root}", file=sys.stderr)
+    print(
+        f"Scanned {scanned} directories, {skipped} unchanged since the last run were not listed again.",
+        file=sys.stderr,
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,6 @@
 # /// script
 # command = "resize"
-# description = "Resizes the images in the current directory to a specified width"
+# description = "Resizes the images in the current directory to one or more specified widths"
 # aliases = ["resize"]
 # author = "janoelze"
 # dependencies = [
@@ -10,43 +10,161 @@
 
 import sys
 import os
+import re
+import time
 import argparse
 import concurrent.futures
 from PIL import Image
 import glob
 
-def resize_image(path, width):
+# Let resize() shrink by an integer factor first when the image is at least this
+# many times larger than the target, then resample the rest with LANCZOS
+REDUCING_GAP = 3.0
+# File names written by resize ("photo-w640.jpg"), see is_output
+OUTPUT_NAME = re.compile(r"^(.*)-w(\d+)$")
+
+def output_path(path, width):
+    """Return the path resize writes the copy of path at width to."""
+    root, extension = os.path.splitext(path)
+    return f"{root}-w{width}{extension}"
+
+def is_output(path, widths):
+    """
+    Return True if path is the copy resize writes of an image next to it at one of widths.
+
+    A name like "scan-w2.jpg" alone doesn't make a file an output: "scan.jpg" has to
+    exist too, and 2 has to be one of the requested widths.
+    """
+    root, extension = os.path.splitext(path)
+    match = OUTPUT_NAME.match(root)
+    return bool(match) and int(match.group(2)) in widths and os.path.exists(match.group(1) + extension)
+
+def stale_widths(path, widths):
+    """Return the widths whose output is missing or older than the image at path."""
+    source_mtime = os.stat(path).st_mtime_ns
+    stale = []
+    for width in widths:
+        try:
+            if os.stat(output_path(path, width)).st_mtime_ns > source_mtime:
+                continue
+        except OSError:
+            pass
+        stale.append(width)
+    return stale
+
+def parse_widths(value):
+    """Parse a comma-separated list of widths, e.g. "320,640,1280"."""
+    try:
+        widths = sorted({int(width) for width in value.split(",") if width.strip()}, reverse=True)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid width list: {value}")
+    if not widths or widths[-1] <= 0:
+        raise argparse.ArgumentTypeError(f"invalid width list: {value}")
+    return widths
+
+def resize_image(path, widths):
+    """
+    Write a copy of the image at path for each of widths, decoding it only once.
+
+    JPEGs are decoded in draft mode, which lets the decoder skip straight to the
+    smallest 1/2, 1/4 or 1/8 scale that is still at least as large as the widest
+    output, so no full-size pixels are decoded when shrinking heavily.
+    """
     img = Image.open(path)
-    wpercent = (width / float(img.size[0]))
-    hsize = int((float(img.size[1]) * float(wpercent)))
-    img = img.resize((width, hsize), Image.Resampling.LANCZOS)
-    new_path = f"{os.path.splitext(path)[0]}-w{width}{os.path.splitext(path)[1]}"
-    img.save(new_path)
-    return new_path
-
-def resize_images(paths, width):
-    image_files = [p for p in paths if p.lower().endswith((".jpg", ".jpeg", ".png"))]
-
-    if image_files:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(resize_image, path, width) for path in image_files]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    print(f"Resized: {future.result()}")
-                except Exception as e:
-                    print(f"Error: {e}")
+    width, height = img.size
+    largest = max(widths)
+    if img.format == "JPEG":
+        img.draft(img.mode, (largest, max(1, round(height * largest / width))))
+    img.load()
+
+    new_paths = []
+    for new_width in widths:
+        new_height = int(height * new_width / width)
+        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+        new_path = output_path(path, new_width)
+        resized.save(new_path)
+        new_paths.append(new_path)
+    return new_paths
+
+def resize_task(task):
+    """Run resize_image in a worker process, returning (path, new paths, error)."""
+    path, widths = task
+    try:
+        return path, resize_image(path, widths), None
+    except Exception as e:
+        return path, [], str(e)
+
+def resize_images(paths, widths, jobs=None, force=False):
+    """
+    Resize images in a pool of jobs processes (one per core by default).
+
+    Outputs of earlier runs (see is_output) are not used as inputs and are counted
+    as excluded in the summary. Unless force is set, widths
+    whose output is newer than the image are skipped, and images with nothing
+    left to do aren't sent to the pool at all. Tasks are handed to the workers
+    in chunks to keep the overhead per image low.
+    """
+    image_files = []
+    excluded = 0
+    for path in sorted(p for p in paths if p.lower().endswith((".jpg", ".jpeg", ".png"))):
+        if is_output(path, widths):
+            excluded += 1
+        else:
+            image_files.append(path)
+
+    if not image_files:
+        print(f"No image files found to resize ({excluded} outputs of earlier runs excluded)")
+        return 0
+
+    start_time = time.time()
+    tasks = []
+    skipped = failed = 0
+    for path in image_files:
+        try:
+            stale = widths if force else stale_widths(path, widths)
+        except OSError as e:
+            print(f"Error: {path}: {e}")
+            failed += 1
+            continue
+        if stale:
+            tasks.append((path, stale))
+        else:
+            skipped += 1
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks) or 1))
+    processed = outputs = 0
+    if jobs == 1:
+        results = map(resize_task, tasks)
     else:
-        print("No image files found to resize")
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(resize_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+    try:
+        for path, new_paths, error in results:
+            if error:
+                print(f"Error: {path}: {error}")
+                failed += 1
+            else:
+                print(f"Resized: {', '.join(new_paths)}")
+                processed += 1
+                outputs += len(new_paths)
+    finally:
+        if jobs > 1:
+            executor.shutdown()
+
+    elapsed = time.time() - start_time
+    print(
+        f"Processed {processed} images ({outputs} outputs), skipped {skipped} up to date, "
+        f"excluded {excluded} outputs of earlier runs, {failed} failed in {elapsed:.2f}s ({processed / max(elapsed, 1e-9):.1f} images/s)"
+    )
+    return failed
 
 def main():
-    parser = argparse.ArgumentParser(description="Resize images to a specified width with glob support.")
-    parser.add_argument("width", type=int, help="The width to resize the images to")
+    parser = argparse.ArgumentParser(description="Resize images to one or more widths with glob support.")
+    parser.add_argument("widths", type=parse_widths, help="The width to resize the images to, or a comma-separated list of widths (e.g. 320,640,1280)")
     parser.add_argument("path", nargs='?', default=os.getcwd(), help="Directory or file pattern to resize (supports glob)")
-    args = parser.parse_args()
-
-    if args.width <= 0:
-        print("Error: Invalid width")
-        sys.exit(1)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes (default: one per core)")
+    parser.add_argument("-f", "--force", action="store_true", help="Resize images even if their outputs are up to date")
+    args = parser.parse_intermixed_args()
 
     paths = []
 
@@ -55,7 +173,8 @@ def main():
     else:
         paths = glob.glob(args.path)
 
-    resize_images(paths, args.width)
+    if resize_images(paths, args.widths, jobs=args.jobs, force=args.force):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Tests of act's downloads against a local stand-in for the community repository.
+
+A threaded http.server serves a manifest and scripts, and act is pointed at it with
+ACT_REPO_URL_BASE. `act install` runs in a subprocess with HOME set to a temporary
+directory; the connection pool and the HTTP cache are also tested in-process.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+import subprocess
+import http.server
+
+import pytest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+
+import act  # noqa: E402
+
+PROXY_VARIABLES = ("http_proxy", "https_proxy", "all_proxy", "no_proxy")
+
+
+def community_script(command):
+    return f'''# /// script
+# dependencies = []
+# command = "{command}"
+# description = "Test script {command}"
+# author = "tester"
+# ///
+
+print("{command}")
+'''
+
+
+def publish_manifest(server):
+    """Regenerate the manifest from the scripts the server has, as CI does after a push."""
+    scripts = {path[1:-3]: body for path, body in server.files.items() if path.endswith(".py")}
+    manifest = {"scripts": [
+        {
+            "file": f"./community-scripts/{command}.py",
+            "command": command,
+            "author": "tester",
+            "aliases": [],
+            "sha256": hashlib.sha256(body).hexdigest(),
+        }
+        for command, body in sorted(scripts.items())
+    ]}
+    server.files["/index"] = json.dumps(manifest).encode("utf-8")
+
+
+class RepositoryHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def send_response(self, code, message=None):
+        with self.server.lock:
+            self.server.statuses.append(code)
+        super().send_response(code, message)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append((self.path, dict(self.headers)))
+        if self.path in self.server.redirects:
+            self.send_response(302)
+            self.send_header("Location", self.server.redirects[self.path])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.server.files.get(self.path.rpartition("/repo")[2])
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """A community repository serving the scripts "alpha" and "beta" under /repo."""
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RepositoryHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.connections = 0
+    httpd.requests = []
+    httpd.statuses = []
+    httpd.redirects = {}
+    httpd.files = {f"/{command}.py": community_script(command).encode("utf-8") for command in ("alpha", "beta")}
+    publish_manifest(httpd)
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def no_proxies(monkeypatch):
+    for variable in PROXY_VARIABLES:
+        monkeypatch.delenv(variable, raising=False)
+        monkeypatch.delenv(variable.upper(), raising=False)
+
+
+def run_act(home, server, *args, stdin="y\n"):
+    env = {key: value for key, value in os.environ.items() if key.lower() not in PROXY_VARIABLES}
+    env.update(HOME=str(home), ACT_REPO_URL_BASE=f"{server.url}/repo")
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, "act.py"), *args],
+        input=stdin, capture_output=True, text=True, env=env, timeout=60,
+    )
+
+
+def test_install_several_scripts(tmp_path, server):
+    result = run_act(tmp_path, server, "install", "alpha", "beta")
+    assert result.returncode == 0, result.stderr
+    for command in ("alpha", "beta"):
+        with open(tmp_path / ".act" / "community" / f"{command}.py", "rb") as f:
+            assert f.read() == server.files[f"/{command}.py"]
+    assert "Succesfully installed 'alpha'" in result.stdout
+    assert "Succesfully installed 'beta'" in result.stdout
+
+
+def test_install_reports_missing_script(tmp_path, server):
+    result = run_act(tmp_path, server, "install", "alpha", "missing")
+    assert result.returncode != 0
+    assert "Failed to download script 'missing': HTTP 404" in result.stderr
+    # Nothing is installed when any of the scripts fails.
+    assert not (tmp_path / ".act" / "community" / "alpha.py").exists()
+
+
+def test_install_rechecks_a_stale_manifest(tmp_path, server):
+    assert run_act(tmp_path, server, "install", "alpha").returncode == 0
+    # beta changes upstream after the manifest was cached by the first install.
+    server.files["/beta.py"] += b"print('changed')\n"
+    publish_manifest(server)
+    del server.requests[:]
+    result = run_act(tmp_path, server, "install", "beta")
+    assert result.returncode == 0, result.stderr
+    with open(tmp_path / ".act" / "community" / "beta.py", "rb") as f:
+        assert f.read() == server.files["/beta.py"]
+    assert [path for path, _ in server.requests].count("/repo/index") == 1
+
+
+def test_install_rejects_a_script_not_matching_the_manifest(tmp_path, server):
+    server.files["/beta.py"] += b"print('tampered')\n"
+    result = run_act(tmp_path, server, "install", "beta")
+    assert result.returncode != 0
+    assert "Downloaded script 'beta' does not match the hash in the manifest" in result.stderr
+    assert not (tmp_path / ".act" / "community" / "beta.py").exists()
+
+
+def test_pool_reuses_connections(server, no_proxies):
+    pool = act.ConnectionPool()
+    try:
+        for _ in range(3):
+            status, _, body = pool.get(f"{server.url}/repo/alpha.py")
+            assert status == 200
+            assert body == server.files["/alpha.py"]
+    finally:
+        pool.close()
+    assert len(server.requests) == 3
+    assert server.connections == 1
+
+
+def test_pool_follows_redirects(server, no_proxies):
+    server.redirects["/old/alpha.py"] = "/repo/alpha.py"
+    pool = act.ConnectionPool()
+    try:
+        status, _, body = pool.get(f"{server.url}/old/alpha.py")
+    finally:
+        pool.close()
+    assert status == 200
+    assert body == server.files["/alpha.py"]
+
+
+def test_pool_uses_http_proxy(server, no_proxies, monkeypatch):
+    monkeypatch.setenv("http_proxy", server.url)
+    pool = act.ConnectionPool()
+    try:
+        status, _, body = pool.get("http://repository.invalid/repo/beta.py")
+    finally:
+        pool.close()
+    assert status == 200
+    assert body == server.files["/beta.py"]
+    assert server.requests[0][0] == "http://repository.invalid/repo/beta.py"
+
+
+def test_cached_response_is_revalidated(tmp_path, server, no_proxies, monkeypatch):
+    monkeypatch.setattr(act, "HTTP_CACHE_DIR", str(tmp_path / "http"))
+    url = f"{server.url}/repo/alpha.py"
+    pool = act.ConnectionPool()
+    try:
+        assert act.http_get_cached(url, pool) == (200, server.files["/alpha.py"], False)
+        assert act.http_get_cached(url, pool) == (200, server.files["/alpha.py"], False)
+    finally:
+        pool.close()
+    (_, first), (_, second) = server.requests
+    assert "If-None-Match" not in first
+    assert second["If-None-Match"]
+    assert server.statuses == [200, 304]
+
+    # With the server gone, the cached copy is served and flagged as offline.
+    server.shutdown()
+    server.server_close()
+    pool = act.ConnectionPool()
+    try:
+        assert act.http_get_cached(url, pool) == (200, server.files["/alpha.py"], True)
+    finally:
+        pool.close()